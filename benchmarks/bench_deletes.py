@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Delete generation: level-by-level engine against the former recursive `edits`.
+
+Run with ``python benchmarks/bench_deletes.py``.
+"""
+import random
+import time
+
+from symspellcompound.deletes import generate_deletes
+
+WORD_LENGTHS = (6, 10, 14, 18)
+EDIT_DISTANCES = (2, 3)
+WORDS_PER_LENGTH = 200
+
+
+def recursive_edits(word, edit_distance, deletes, edit_distance_max):
+    edit_distance += 1
+    if len(word) > 1:
+        for index in range(0, len(word)):
+            delete = word[:index] + word[index + 1:]
+            if delete not in deletes:
+                deletes.add(delete)
+                if edit_distance < edit_distance_max:
+                    recursive_edits(delete, edit_distance, deletes, edit_distance_max)
+    return deletes
+
+
+def timed(function, words):
+    start_time = time.perf_counter()
+    for word in words:
+        function(word)
+    return time.perf_counter() - start_time
+
+
+def main():
+    rng = random.Random(0)
+    for edit_distance_max in EDIT_DISTANCES:
+        for length in WORD_LENGTHS:
+            words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyzéè") for _ in range(length))
+                     for _ in range(WORDS_PER_LENGTH)]
+            for word in words[:10]:
+                assert generate_deletes(word, edit_distance_max) == recursive_edits(word, 0, set(), edit_distance_max)
+            legacy = timed(lambda w: recursive_edits(w, 0, set(), edit_distance_max), words)
+            engine = timed(lambda w: generate_deletes(w, edit_distance_max), words)
+            print("--- distance {} length {:2d}: recursive {:.4f} s, levels {:.4f} s, x{:.2f} ---".format(
+                edit_distance_max, length, legacy, engine, legacy / engine))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Import-time budget of the main module.
+
+Run with ``python benchmarks/bench_import.py``, exits non-zero when the budget is exceeded.
+"""
+import subprocess
+import sys
+
+IMPORT_BUDGET = 0.060  # seconds, median over REPEAT fresh interpreters
+REPEAT = 7
+HEAVY_MODULES = ("numpy", "unidecode", "symspellcompound.data", "symspellcompound.typo_distance")
+
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import symspellcompound.symspellcompound
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure_import():
+    output = subprocess.check_output([sys.executable, "-c", SNIPPET.format(heavy=HEAVY_MODULES)],
+                                     universal_newlines=True).splitlines()
+    return float(output[0]), [m for m in output[1].split(",") if m]
+
+
+def main():
+    timings = []
+    loaded = []
+    for _ in range(REPEAT):
+        elapsed, loaded = measure_import()
+        timings.append(elapsed)
+    median = sorted(timings)[len(timings) // 2]
+    print("--- import symspellcompound.symspellcompound: {:.4f} s (budget {:.4f} s) ---".format(median, IMPORT_BUDGET))
+    if loaded:
+        print("Eagerly loaded heavy modules: {}".format(", ".join(loaded)))
+        return 1
+    if median > IMPORT_BUDGET:
+        print("Import-time budget exceeded")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""`DocumentCorrector` on long documents: the coordinator's banded distance against the former full table.
+
+Documents of misspelled sentences are corrected with 2 worker processes; the time of `join_parts` (the part
+of the coordinator that is not spread over the workers) is reported with the banded and the full
+Damerau-Levenshtein, which must agree. Run with ``python benchmarks/bench_parallel.py``.
+"""
+import time
+
+from symspellcompound.loadtest import MODEL, synthetic_queries
+from symspellcompound.options import LookupOptions
+from symspellcompound.parallel import DocumentCorrector
+from symspellcompound.symspellcompound import SySpellCompound, distance_between_words
+
+DOCUMENT_LENGTHS = (1000, 5000, 10000)
+PROCESSES = 2
+
+
+def document(length):
+    """Sentences of 8 misspelled words, up to `length` characters."""
+    words = synthetic_queries(count=length // 2, seed=2)
+    sentences = [" ".join(words[i:i + 8]) + "." for i in range(0, len(words), 8)]
+    text = ""
+    for sentence in sentences:
+        if len(text) + len(sentence) >= length:
+            break
+        text += sentence + " "
+    return text.strip()
+
+
+def main():
+    spell = SySpellCompound()
+    spell.create_dictionary(MODEL, "fr")
+    with DocumentCorrector(spell, processes=PROCESSES) as corrector:
+        for length in DOCUMENT_LENGTHS:
+            text = document(length)
+            start_time = time.perf_counter()
+            suggestion = corrector.lookup_compound(text, "fr", 2)
+            total = time.perf_counter() - start_time
+
+            tokens = spell.classify_tokens(input_string=text, language="fr")
+            parts, part_tokens, _ = spell.compound_parts(tokens=tokens, language="fr",
+                                                  options=LookupOptions(edit_distance_max=2))
+            start_time = time.perf_counter()
+            joined = spell.join_parts(suggestion_parts=parts, part_tokens=part_tokens, input_string=text)
+            banded = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            distance = distance_between_words(joined.term, text)
+            full = time.perf_counter() - start_time
+            assert str(joined) == str(suggestion) and joined.distance == distance
+            print("--- {} characters, distance {}: {} processes {:.2f} s, join banded {:.3f} s, "
+                  "full {:.3f} s ---".format(len(text), distance, PROCESSES, total, banded, full))
+
+
+if __name__ == "__main__":
+    main()
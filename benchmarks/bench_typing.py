@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Per keystroke latency of `TypingSession`: character-indexed descendants against the former full walk.
+
+Keystrokes past the shared cached prefixes are timed (active set update and suggestions), on the words of
+res/model_fr.txt with synthetic misspelled queries. Run with ``python benchmarks/bench_typing.py``.
+"""
+import time
+
+from symspellcompound.completion import PrefixIndex, TypingSession
+from symspellcompound.loadtest import MODEL, synthetic_queries, percentile
+from symspellcompound.symspellcompound import SySpellCompound
+
+EDIT_DISTANCES = (1, 2)
+QUERIES = 500
+
+
+def walk_advance(session, active, char):
+    """Former `TypingSession._advance`: walks every descendant within reach of each active node."""
+    edit_distance_max = session.edit_distance_max
+    result = {}
+    for node, distance in active.items():
+        if distance < edit_distance_max and result.get(node, edit_distance_max + 1) > distance + 1:
+            result[node] = distance + 1
+        stack = [(child, 1) for child in node.children.values()]
+        while stack:
+            descendant, depth = stack.pop()
+            if descendant.char == char:
+                new_distance = distance + depth - 1
+            elif depth == 1:
+                new_distance = distance + 1
+            else:
+                new_distance = edit_distance_max + 1
+            if new_distance <= edit_distance_max and result.get(descendant, edit_distance_max + 1) > new_distance:
+                result[descendant] = new_distance
+            if depth <= edit_distance_max - distance:
+                stack.extend((child, depth + 1) for child in descendant.children.values())
+    return result
+
+
+def keystrokes(index, queries, edit_distance_max, advance):
+    """Sorted latencies (seconds) of the keystrokes past the cached prefixes."""
+    latencies = []
+    for query in queries:
+        session = index.session(edit_distance_max=edit_distance_max)
+        session.append(query[:index.cached_prefix_length])
+        for char in query[index.cached_prefix_length:]:
+            start_time = time.perf_counter()
+            session._states.append(advance(session, session._states[-1], char))
+            session.text += char
+            session.suggestions()
+            latencies.append(time.perf_counter() - start_time)
+    return sorted(latencies)
+
+
+def main():
+    spell = SySpellCompound()
+    spell.create_dictionary(MODEL, "fr")
+    index = PrefixIndex(spell, "fr")
+    queries = [query for query in synthetic_queries(count=QUERIES, seed=1) if len(query) > index.cached_prefix_length]
+    print("--- {} words, {} keystrokes ---".format(len(spell.word_list),
+                                                   sum(len(q) - index.cached_prefix_length for q in queries)))
+    for edit_distance_max in EDIT_DISTANCES:
+        walk = keystrokes(index, queries, edit_distance_max, walk_advance)
+        keystrokes(index, queries, edit_distance_max, TypingSession._advance)  # indexes the visited nodes
+        indexed = keystrokes(index, queries, edit_distance_max, TypingSession._advance)
+        print("--- distance {}: walk p50 {:.1f} us p99 {:.1f} us, indexed p50 {:.1f} us p99 {:.1f} us ---".format(
+            edit_distance_max, percentile(walk, 50) * 1e6, percentile(walk, 99) * 1e6,
+            percentile(indexed, 50) * 1e6, percentile(indexed, 99) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
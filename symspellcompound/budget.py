@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""Memory-budgeted vocabulary selection for `SySpellCompound.load_dictionary`."""
+from math import factorial
+
+BYTES_PER_ENTRY = 140  # dictionary + item_list bytes per entry, measured with stats() on the French model
+
+
+def deletes_bound(length, edit_distance_max):
+    """Upper bound of the deletes of a word of `length` characters, sum of C(length, k) for k <= distance."""
+    bound = 0
+    for k in range(1, min(edit_distance_max, length - 1) + 1):
+        bound += factorial(length) // (factorial(k) * factorial(length - k))
+    return bound
+
+
+class BuildBudget(object):
+    """Limits the deletes an index build may create.
+
+    # Arguments
+        max_deletes: Maximum number of deletes, counted with `deletes_bound` (without sharing between words),
+            so the real index always stays below it.
+        max_bytes: Memory budget, converted to deletes with `bytes_per_entry`.
+        shallow_length: Words at least that long which do not fit with all their deletes are indexed with
+            distance 1 deletes only, when those fit.
+        bytes_per_entry: Bytes of an index entry.
+    """
+
+    def __init__(self, max_deletes=None, max_bytes=None, shallow_length=10, bytes_per_entry=BYTES_PER_ENTRY):
+        if max_deletes is None and max_bytes is None:
+            raise ValueError("BuildBudget needs max_deletes or max_bytes")
+        limits = [limit for limit in (max_deletes, None if max_bytes is None else max_bytes // bytes_per_entry)
+                  if limit is not None]
+        self.max_deletes = min(limits)
+        self.shallow_length = shallow_length
+
+    def plan(self, terms, edit_distance_max):
+        """Chooses the words to index, most frequent first.
+
+        # Arguments
+            terms: Dict term -> count.
+            edit_distance_max: Distance of the index.
+        # Returns
+            (plan, report): plan is the list of (term, count, delete depth) to insert, report a BuildReport.
+        """
+        report = BuildReport(max_deletes=self.max_deletes)
+        plan = []
+        used = 0
+        for term, count in sorted(terms.items(), key=lambda x: (-x[1], len(x[0]), x[0])):
+            full = deletes_bound(len(term), edit_distance_max)
+            shallow = deletes_bound(len(term), 1)
+            if used + full <= self.max_deletes:
+                depth, cost = edit_distance_max, full
+            elif len(term) >= self.shallow_length and used + shallow <= self.max_deletes:
+                depth, cost = 1, shallow
+                report.shallow_words += 1
+            else:
+                report.drop(term, count)
+                continue
+            used += cost
+            plan.append((term, count, depth))
+        report.words = len(plan)
+        report.deletes_bound = used
+        return plan, report
+
+
+class BuildReport(object):
+    """What a budgeted build kept and dropped."""
+
+    def __init__(self, max_deletes):
+        self.max_deletes = max_deletes
+        self.words = 0
+        self.shallow_words = 0
+        self.deletes_bound = 0
+        self.dropped_words = 0
+        self.dropped_count = 0
+        self.dropped_per_length = {}
+        self.count_threshold = None  # every word more frequent than this was kept
+        self.top_dropped = []  # most frequent dropped words, (term, count)
+
+    def drop(self, term, count):
+        self.dropped_words += 1
+        self.dropped_count += count
+        self.dropped_per_length[len(term)] = self.dropped_per_length.get(len(term), 0) + 1
+        if self.count_threshold is None:
+            self.count_threshold = count
+        if len(self.top_dropped) < 20:
+            self.top_dropped.append((term, count))
+
+    def __str__(self):
+        return "{} words kept ({} with distance 1 deletes only), {} dropped (total count {}), " \
+               "deletes <= {} / {}, count threshold {}".format(self.words, self.shallow_words, self.dropped_words,
+                                                               self.dropped_count, self.deletes_bound,
+                                                               self.max_deletes, self.count_threshold)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Pre-classification of `lookup_compound` tokens.
+
+Protected tokens (numbers, urls, emails, hashtags, punctuation...) are passed through untouched and tokens
+already in the vocabulary skip `lookup`. Punctuation around a word and its casing are kept in the output.
+"""
+import re
+
+LOOKUP = "lookup"
+KNOWN = "known"
+PROTECTED = "protected"
+
+DEFAULT_RULES = [
+    ("number", r"[+-]?\d+(?:[.,:/]\d+)*(?:%|e|er|ème|h)?"),
+    ("url", r"(?:[a-zA-Z][a-zA-Z0-9+.-]*://|www\.)\S+"),
+    ("email", r"[^@\s]+@[^@\s]+\.\w+"),
+    ("hashtag", r"[#@]\w+"),
+    ("punctuation", r"[^\w\s]+"),
+]
+
+AFFIXES = re.compile(r"^([^\w]*)(.*?)([^\w]*)$", re.UNICODE)
+
+
+class Token(object):
+    def __init__(self, text, term=None, kind=LOOKUP, prefix="", suffix="", rule=None, count=0):
+        self.text = text
+        self.term = text if term is None else term
+        self.kind = kind
+        self.prefix = prefix
+        self.suffix = suffix
+        self.rule = rule
+        self.count = count
+
+    def restore(self, term, source=None):
+        """Reapplies the casing and punctuation of the original token to a corrected term."""
+        if self.kind == PROTECTED:
+            return self.text
+        source = self.core if source is None else source
+        if len(source) > 1 and source.isupper():
+            term = term.upper()
+        elif source[:1].isupper():
+            term = term[:1].upper() + term[1:]
+        return self.prefix + term + self.suffix
+
+    @property
+    def core(self):
+        return self.text[len(self.prefix):len(self.text) - len(self.suffix)]
+
+
+class TokenClassifier(object):
+    """Classifies whitespace tokens before `lookup_compound` corrects them.
+
+    # Arguments
+        rules: List of (name, regex) fully matching protected tokens, defaults to DEFAULT_RULES.
+        protect_digits: Whether words containing a digit (references, models...) are protected.
+        lower: Whether terms are lowercased before being looked up (dictionaries are loaded lowercased).
+        check_vocabulary: Whether exact vocabulary words short-circuit `lookup`.
+    """
+
+    def __init__(self, rules=None, protect_digits=True, lower=True, check_vocabulary=True):
+        self.rules = [(name, re.compile(pattern, re.UNICODE))
+                      for name, pattern in (DEFAULT_RULES if rules is None else rules)]
+        self.protect_digits = protect_digits
+        self.lower = lower
+        self.check_vocabulary = check_vocabulary
+
+    def classify(self, text, spell, language):
+        for name, pattern in self.rules:
+            if pattern.fullmatch(text):
+                return Token(text, kind=PROTECTED, rule=name)
+
+        prefix, core, suffix = AFFIXES.match(text).groups()
+        if not core:
+            return Token(text, kind=PROTECTED, rule="punctuation")
+        if self.protect_digits and any(c.isdigit() for c in core):
+            return Token(text, kind=PROTECTED, rule="digits")
+
+        term = core.lower() if self.lower else core
+        token = Token(text, term=term, prefix=prefix, suffix=suffix)
+        if self.check_vocabulary:
+            count = spell.word_count(language=language, term=term)
+            if count:
+                token.kind = KNOWN
+                token.count = count
+        return token
+
+    def tokenize(self, input_string, spell, language):
+        return [self.classify(text, spell=spell, language=language) for text in input_string.split()]
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""Incremental as-you-type correction and completion.
+
+A `PrefixIndex` is a trie over the `word_list` of a SySpellCompound. A `TypingSession` keeps, for every
+typed prefix, the set of trie nodes within `edit_distance_max` of it (the active nodes); appending a
+character only extends the previous set instead of redoing a full lookup, and backspace pops it. Each node
+indexes its descendants a few levels down by character, so a keystroke only visits the matching ones.
+
+Run ``python benchmarks/bench_typing.py`` for the per keystroke latencies.
+"""
+import heapq
+
+from .items import SuggestItem
+
+
+class TrieNode(object):
+    __slots__ = ("char", "children", "word", "count", "top", "below")
+
+    def __init__(self, char=""):
+        self.char = char
+        self.children = {}
+        self.word = None
+        self.count = 0
+        self.top = None  # top completions (count, word) of the subtree, computed on first use
+        self.below = None  # (depth, {char: [(descendant, its depth)]}) of the descendants up to depth
+
+
+class PrefixIndex(object):
+    """Trie of the words of `spell` for `language`, each node caching its `top_k` completions by count."""
+
+    def __init__(self, spell, language, top_k=10, cached_prefix_length=3):
+        self.top_k = top_k
+        self.cached_prefix_length = cached_prefix_length
+        # Active nodes of the short prefixes, the largest sets, and their suggestions, shared by every session
+        self.states = {}
+        self.ranked = {}
+        self.reach_depth = 1  # depth of the descendants indexed by `below`, edit_distance_max + 1 of the sessions
+        self.root = TrieNode()
+        for word in spell.word_list:
+            count = spell.word_count(language=language, term=word)
+            if count:
+                self.add(word, count)
+
+    def add(self, word, count):
+        node = self.root
+        for char in word:
+            child = node.children.get(char, None)
+            if child is None:
+                child = node.children[char] = TrieNode(char)
+            node.top = None
+            node.below = None
+            node = child
+        node.top = None
+        node.below = None
+        node.word = word
+        node.count = count
+        self.states = {}
+        self.ranked = {}
+
+    def completions(self, node):
+        if node.top is None:
+            candidates = [(node.count, node.word)] if node.word is not None else []
+            for child in node.children.values():
+                candidates.extend(self.completions(child))
+            node.top = heapq.nlargest(self.top_k, candidates)
+        return node.top
+
+    def index_below(self, node):
+        """Sets and returns `node.below`: its descendants up to `reach_depth` by character, by depth."""
+        descendants = {}
+        level = [node]
+        for depth in range(1, self.reach_depth + 1):
+            level = [child for parent in level for child in parent.children.values()]
+            for descendant in level:
+                descendants.setdefault(descendant.char, []).append((descendant, depth))
+        node.below = (self.reach_depth, descendants)
+        return node.below
+
+    def complete(self, prefix):
+        """Exact prefix completions ranked by count."""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char, None)
+            if node is None:
+                return []
+        return self.completions(node)
+
+    def session(self, edit_distance_max=1, max_suggestions=5):
+        return TypingSession(self, edit_distance_max=edit_distance_max, max_suggestions=max_suggestions)
+
+
+class TypingSession(object):
+    """Per-user state of a search box, see `append`, `backspace` and `update`."""
+
+    def __init__(self, index, edit_distance_max=1, max_suggestions=5):
+        self.index = index
+        self.edit_distance_max = edit_distance_max
+        self.max_suggestions = max_suggestions
+        self.text = ""
+        index.reach_depth = max(index.reach_depth, edit_distance_max + 1)
+        state = index.states.get((edit_distance_max, ""), None)
+        if state is None:
+            state = index.states[(edit_distance_max, "")] = self._initial()
+        self._states = [state]
+
+    def _initial(self):
+        active = {}
+        stack = [(self.index.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            active[node] = depth
+            if depth < self.edit_distance_max:
+                stack.extend((child, depth + 1) for child in node.children.values())
+        return active
+
+    def _advance(self, active, char):
+        edit_distance_max = self.edit_distance_max
+        reach_depth = self.index.reach_depth
+        result = {}
+        for node, distance in active.items():
+            slack = edit_distance_max - distance
+            if not slack:
+                # No edit left: only a child holding the typed character stays active
+                child = node.children.get(char, None)
+                if child is not None and result.get(child, edit_distance_max + 1) > distance:
+                    result[child] = distance
+                continue
+            # The typed character is an extra one, or substitutes a child
+            if result.get(node, edit_distance_max + 1) > distance + 1:
+                result[node] = distance + 1
+            for child in node.children.values():
+                if result.get(child, edit_distance_max + 1) > distance + 1:
+                    result[child] = distance + 1
+            # Match it with a descendant, the skipped nodes are missing characters
+            below = node.below
+            if below is None or below[0] < reach_depth:
+                below = self.index.index_below(node)
+            for descendant, depth in below[1].get(char, ()):
+                if depth > slack + 1:
+                    break
+                if result.get(descendant, edit_distance_max + 1) > distance + depth - 1:
+                    result[descendant] = distance + depth - 1
+        return result
+
+    def append(self, chars):
+        for char in chars:
+            text = self.text + char
+            state = None
+            if len(text) <= self.index.cached_prefix_length:
+                state = self.index.states.get((self.edit_distance_max, text), None)
+            if state is None:
+                state = self._advance(self._states[-1], char)
+                if len(text) <= self.index.cached_prefix_length:
+                    self.index.states[(self.edit_distance_max, text)] = state
+            self._states.append(state)
+            self.text = text
+        return self.suggestions()
+
+    def backspace(self, count=1):
+        count = min(count, len(self.text))
+        if count:
+            del self._states[-count:]
+            self.text = self.text[:-count]
+        return self.suggestions()
+
+    def update(self, text):
+        """Moves the session to `text`, reusing the state of the common prefix with the previous text."""
+        common = 0
+        while common < min(len(text), len(self.text)) and text[common] == self.text[common]:
+            common += 1
+        self.backspace(len(self.text) - common)
+        return self.append(text[common:])
+
+    def suggestions(self):
+        key = (self.edit_distance_max, self.text, self.max_suggestions)
+        ranked = self.index.ranked.get(key, None) if len(self.text) <= self.index.cached_prefix_length else None
+        if ranked is None:
+            ranked = self._rank()
+            if len(self.text) <= self.index.cached_prefix_length:
+                self.index.ranked[key] = ranked
+        suggestions = []
+        for word, (distance, count) in ranked:
+            si = SuggestItem()
+            si.term = word
+            si.distance = distance
+            si.count = count
+            suggestions.append(si)
+        return suggestions
+
+    def _rank(self):
+        """[(word, (distance, count))] of the best suggestions for the current text."""
+        levels = [[] for _ in range(self.edit_distance_max + 1)]
+        for node, distance in self._states[-1].items():
+            levels[distance].append(node)
+        best = {}
+        for distance, nodes in enumerate(levels):
+            # Words found at a smaller distance always rank first
+            if len(best) >= self.max_suggestions:
+                break
+            for node in nodes:
+                for count, word in self.index.completions(node):
+                    if word not in best:
+                        best[word] = (distance, count)
+        return heapq.nsmallest(self.max_suggestions, best.items(), key=lambda x: (x[1][0], -x[1][1], x[0]))
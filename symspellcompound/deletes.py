@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""Delete generation shared by the index build and the lookup candidate expansion.
+
+Deletes are generated level by level (one more deleted character per level) as combinations of positions:
+a term carries the position of its last deletion and its own deletes only remove characters from there on,
+so "abc" -> "bc" -> "c" is produced but not "abc" -> "ac" -> "c" again. Deleting any character of a run
+gives the same string, only the first one is deleted. Each level is deduplicated keeping the smallest start,
+which keeps every reachable delete.
+"""
+
+
+def expand_deletes(term, start, deletes):
+    """Adds to `deletes` (delete -> start) the single deletes of `term` at positions >= `start`.
+    # Returns
+        The list of deletes which were not in `deletes` yet.
+    """
+    added = []
+    if len(term) <= 1:
+        return added
+    previous = None
+    for index in range(start, len(term)):
+        char = term[index]
+        if char == previous:
+            continue
+        previous = char
+        delete = term[:index] + term[index + 1:]
+        known = deletes.get(delete, None)
+        if known is None:
+            deletes[delete] = index
+            added.append(delete)
+        elif known > index:
+            deletes[delete] = index
+    return added
+
+
+def delete_levels(word, edit_distance_max):
+    """Yields the deletes of `word` at distance 1 to `edit_distance_max`, one dict (delete -> start) per level."""
+    level = {word: 0}
+    for _ in range(edit_distance_max):
+        next_level = {}
+        for term, start in level.items():
+            expand_deletes(term, start, next_level)
+        if not next_level:
+            break
+        yield next_level
+        level = next_level
+
+
+def generate_deletes(word, edit_distance_max, deletes=None):
+    """Set of all the strings obtained by removing 1 to `edit_distance_max` characters of `word`."""
+    deletes = set() if deletes is None else deletes
+    if edit_distance_max < 1:
+        return deletes
+    level = {word: 0}
+    for _ in range(edit_distance_max - 1):
+        next_level = {}
+        for term, start in level.items():
+            expand_deletes(term, start, next_level)
+        deletes.update(next_level)
+        level = next_level
+    # Deletes of the last level are not expanded, their start is not needed
+    for term, start in level.items():
+        if len(term) > 1:
+            deletes.update([term[:index] + term[index + 1:] for index in range(start, len(term))])
+    return deletes
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Bounded cache of pairwise distances, shared by the lookups of one index.
+
+The same (suggestion, input) pairs come back across queries and `lookup_compound` scores the same joined
+strings again; the typo metric makes every computation expensive.
+"""
+from collections import OrderedDict
+import threading
+
+
+def trim_common_affixes(word1, word2):
+    """`word1` and `word2` without their common prefix and suffix."""
+    i = 0
+    while i < len(word1) and i < len(word2) and word1[i] == word2[i]:
+        i += 1
+    j = 0
+    while j < len(word1) - i and j < len(word2) - i and word1[-j - 1] == word2[-j - 1]:
+        j += 1
+    return word1[i:len(word1) - j], word2[i:len(word2) - j]
+
+
+class DistanceCache(object):
+    """Least recently used cache in front of a distance function, see `SySpellCompound(distance_cache=...)`.
+
+    # Arguments
+        distance: Function taking the two words to compare.
+        max_size: Maximum number of cached pairs, the least recently used one is evicted past it.
+        trim: The metric ignores a common prefix and suffix (edit distances): pairs are keyed on the trimmed
+            words so that every pair differing the same way shares one entry.
+        symmetric: distance(a, b) == distance(b, a), both orders share one entry.
+    """
+
+    def __init__(self, distance, max_size=65536, trim=False, symmetric=False):
+        self.distance = distance
+        self.max_size = max_size
+        self.trim = trim
+        self.symmetric = symmetric
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pairs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, word1, word2):
+        if self.trim:
+            word1, word2 = trim_common_affixes(word1, word2)
+        key = (word2, word1) if self.symmetric and word2 < word1 else (word1, word2)
+        with self._lock:
+            distance = self._pairs.get(key, None)
+            if distance is not None:
+                self._pairs.move_to_end(key)
+                self.hits += 1
+                return distance
+            self.misses += 1
+        distance = self.distance(*key)
+        with self._lock:
+            self._pairs[key] = distance
+            if len(self._pairs) > self.max_size:
+                self._pairs.popitem(last=False)
+                self.evictions += 1
+        return distance
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def clear(self):
+        with self._lock:
+            self._pairs.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self._pairs), "max_size": self.max_size, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -1,2 +1,18 @@
 class DistanceException(Exception):
     pass
+
+
+class NormalizerException(Exception):
+    pass
+
+
+class FrozenIndexException(Exception):
+    pass
+
+
+class EngineException(Exception):
+    pass
+
+
+class UnsupportedOperationException(Exception):
+    pass
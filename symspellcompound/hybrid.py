@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""Compact store of the rare words of a hybrid index.
+
+Only the most frequent words get deletes in `SySpellCompound.dictionary`; the others are kept here,
+bucketed by language and length. A bucket is one string concatenating its sorted words (all of the same
+length, so no object per word), a NumPy array of counts and one of character-set signatures. `lookup`
+searches it only when the main index has nothing good enough: buckets within the edit distance are
+filtered on their signatures, then the survivors are verified with the bounded distance.
+"""
+import bisect
+import math
+
+import numpy as np
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def signature(term):
+    """32 bit set of the characters of `term`: an edit changes at most 2 bits, a transposition none."""
+    bits = 0
+    for c in term:
+        bits |= 1 << (ord(c) % 32)
+    return bits
+
+
+class Bucket(object):
+    def __init__(self, length, words):
+        words = sorted(words)
+        self.length = length
+        self.words = "".join(word for word, _ in words)
+        self.counts = np.array([count for _, count in words], dtype=np.int64)
+        self.signatures = np.array([signature(word) for word, _ in words], dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def word(self, index):
+        return self.words[index * self.length:(index + 1) * self.length]
+
+    def find(self, term):
+        """Index of `term` or -1, by binary search on the fixed width words."""
+        keys = _BucketKeys(self)
+        index = bisect.bisect_left(keys, term)
+        if index < len(self) and self.word(index) == term:
+            return index
+        return -1
+
+    def candidates(self, term, max_changed_bits):
+        """Indexes of the words whose signature is within `max_changed_bits` of the one of `term`."""
+        changed = np.bitwise_xor(self.signatures, np.uint32(signature(term))).view(np.uint8).reshape(-1, 4)
+        return np.nonzero(POPCOUNT[changed].sum(axis=1) <= max_changed_bits)[0]
+
+
+class _BucketKeys(object):
+    """Sequence view of the words of a bucket for bisect."""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def __len__(self):
+        return len(self.bucket)
+
+    def __getitem__(self, index):
+        return self.bucket.word(index)
+
+
+class TailStore(object):
+    """Rare words of a hybrid index, see `SySpellCompound.load_dictionary(top_words=...)`.
+
+    Added words are searched once `compile` has built their buckets; searches only read the buckets.
+    # Arguments
+        fallback_distance: The tail is searched when the best suggestion of the main index is farther
+            than this (0: whenever the term is not an indexed word). None is `edit_distance_max - 1`: only
+            when the index has no suggestion or only ones at the largest distance.
+    """
+
+    def __init__(self, fallback_distance=None):
+        self.fallback_distance = fallback_distance
+        self.buckets = {}  # language -> {length: Bucket}
+        self._pending = {}  # language -> {length: [(word, count)]}, added since the last compile
+
+    def add(self, language, word, count):
+        self._pending.setdefault(language, {}).setdefault(len(word), []).append((word, count))
+
+    def compile(self):
+        """Builds the buckets of the words added since the last call."""
+        for language, lengths in self._pending.items():
+            buckets = self.buckets.setdefault(language, {})
+            for length, words in lengths.items():
+                bucket = buckets.get(length, None)
+                if bucket is not None:
+                    words.extend((bucket.word(i), int(bucket.counts[i])) for i in range(len(bucket)))
+                buckets[length] = Bucket(length, words)
+        self._pending = {}
+
+    def _bucket(self, language, length):
+        return self.buckets.get(language, {}).get(length, None)
+
+    def __len__(self):
+        return sum(len(bucket) for buckets in self.buckets.values() for bucket in buckets.values())
+
+    def count(self, language, term):
+        bucket = self._bucket(language, len(term))
+        if bucket is None:
+            return 0
+        index = bucket.find(term)
+        return 0 if index < 0 else int(bucket.counts[index])
+
+    def search(self, language, term, edit_distance_max, distance):
+        """(word, count, distance) of the tail words within `edit_distance_max` of `term`."""
+        results = []
+        edits = int(math.ceil(edit_distance_max))  # metrics such as typo return fractional distances
+        for length in range(max(len(term) - edits, 1), len(term) + edits + 1):
+            bucket = self._bucket(language, length)
+            if bucket is None:
+                continue
+            for index in bucket.candidates(term, 2 * edits):
+                word = bucket.word(index)
+                word_distance = distance(word, term)
+                if word_distance <= edit_distance_max:
+                    results.append((word, int(bucket.counts[index]), word_distance))
+        return results
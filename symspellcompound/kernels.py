@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Vectorized distance kernels verifying many lookup candidates in one call.
+
+pyxdameraulevenshtein compares one pair per call (its `_seqs` variants loop over the pairs), so the cost of a
+lookup with hundreds of suggestions is the interpreter going through them one at a time. Here the edit
+distance table is filled one row (one character of the term) at a time for every candidate at once.
+"""
+import numpy as np
+
+
+def encode(words):
+    """(codes, lengths): code points of `words` padded with -1 in an (n, longest) array, and their lengths."""
+    lengths = np.fromiter((len(word) for word in words), dtype=np.int64, count=len(words))
+    longest = int(lengths.max()) if len(words) else 0
+    codes = np.full((len(words), longest), -1, dtype=np.int64)
+    codes[np.arange(longest) < lengths[:, None]] = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+    return codes, lengths
+
+
+def damerau_levenshtein_batch(term, words):
+    """Restricted Damerau-Levenshtein distances (those of pyxdameraulevenshtein) of `term` to each word.
+
+    # Arguments
+        term: The string the words are compared to.
+        words: Sequence of strings.
+    # Returns
+        An int array of the distances, in the order of `words`.
+    """
+    codes, lengths = encode(words)
+    if not len(term):
+        return lengths
+    columns = np.arange(codes.shape[1] + 1)
+    # equal[i, k, j]: character i of the term is character j of word k, for every row at once
+    equal = codes[None, :, :] == np.array([ord(char) for char in term])[:, None, None]
+    previous = np.tile(columns, (len(words), 1))
+    previous_previous = None
+    row = np.empty_like(previous)
+    for i in range(1, len(term) + 1):
+        # Substitution (or match) and deletion, the insertions are chained along the row below
+        costs = row[:, 1:]
+        np.add(previous[:, :-1], ~equal[i - 1], out=costs)
+        np.minimum(costs, previous[:, 1:] + 1, out=costs)
+        if previous_previous is not None and codes.shape[1] > 1:
+            transposed = equal[i - 1][:, :-1] & equal[i - 2][:, 1:]
+            np.minimum(costs[:, 1:], np.where(transposed, previous_previous[:, :-2] + 1, costs[:, 1:]),
+                       out=costs[:, 1:])
+        # row[j] = min over k <= j of costs[k] + (j - k) insertions, with row[0] = i
+        row[:, 0] = i
+        row -= columns
+        np.minimum.accumulate(row, axis=1, out=row)
+        row += columns
+        previous_previous, previous, row = previous, row, \
+            np.empty_like(previous) if previous_previous is None else previous_previous
+    return previous[np.arange(len(words)), lengths]
+
+
+def damerau_levenshtein_banded(term, other, bound):
+    """Restricted Damerau-Levenshtein distance of two long strings, exact when it is at most `bound`.
+
+    Only the cells of the table within `bound` of its diagonal are filled (Ukkonen's band), one row at a time,
+    so the cost is O(len(term) * bound) instead of O(len(term) * len(other)).
+    # Arguments
+        term: The first string.
+        other: The second string.
+        bound: Band half width, the largest distance computed exactly.
+    # Returns
+        The distance if it is at most `bound`, otherwise a value above `bound`.
+    """
+    if abs(len(term) - len(other)) > bound:
+        return bound + 1
+    width = 2 * bound + 1
+    infinity = len(term) + len(other) + 1
+    # Cell d of row i is column j = i - bound + d; codes[i + d] is the character j - 1 of `other`
+    codes = np.full(len(term) + width, -1, dtype=np.int64)
+    codes[bound + 1:bound + 1 + len(other)] = np.frombuffer(other.encode("utf-32-le"), dtype=np.uint32)
+    term_codes = np.frombuffer(term.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    offsets = np.arange(width)
+    previous = np.where(offsets >= bound, offsets - bound, infinity)
+    previous_previous = None
+    for i in range(1, len(term) + 1):
+        columns = offsets + (i - bound)
+        equal = codes[i:i + width] == term_codes[i - 1]
+        # Substitution (or match) from the same offset of the previous row, deletion from the next offset
+        row = previous + ~equal
+        np.minimum(row[:-1], previous[1:] + 1, out=row[:-1])
+        if previous_previous is not None:
+            transposed = (codes[i - 1:i - 1 + width] == term_codes[i - 1]) & (codes[i:i + width] == term_codes[i - 2])
+            np.minimum(row, np.where(transposed, previous_previous + 1, infinity), out=row)
+        row[(columns < 0) | (columns > len(other))] = infinity
+        if i <= bound:
+            row[bound - i] = i
+        # Insertions chained along the row: row[d] = min over k <= d of row[k] + (d - k)
+        row -= offsets
+        np.minimum.accumulate(row, out=row)
+        row += offsets
+        previous_previous, previous = previous, row
+    return min(int(previous[len(other) - len(term) + bound]), bound + 1)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+"""Load generator checking `lookup` and `lookup_compound` against latency objectives.
+
+Queries come from a log (one per line) or are misspelled words drawn from a text such as res/model_fr.txt.
+They are sent at a fixed rate by threads or processes sharing the index. A query's latency runs from its
+scheduled start, not its actual one: a slow query delays the next ones and that waiting is counted too.
+Times come from `time.monotonic`, which is shared by the processes of a machine and does not jump with the
+wall clock.
+
+Run with ``python -m symspellcompound.loadtest --qps 200 --duration 10 --workers 4``.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+from .options import LookupOptions
+from .symspellcompound import SySpellCompound
+from .tools import text_to_word_sequence
+
+MODEL = os.path.join(os.path.dirname(__file__), "res", "model_fr.txt")
+PERCENTILES = (("p50", 50), ("p95", 95), ("p99", 99), ("p99.9", 99.9))
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+
+_spell = None
+
+
+def misspell(word, edits, alphabet, rng):
+    """`word` with `edits` random deletions, insertions, substitutions or transpositions."""
+    for _ in range(edits):
+        operation = rng.randrange(4) if len(word) > 1 else 1
+        index = rng.randrange(len(word))
+        if operation == 0:
+            word = word[:index] + word[index + 1:]
+        elif operation == 1:
+            word = word[:index] + rng.choice(alphabet) + word[index:]
+        elif operation == 2:
+            word = word[:index] + rng.choice(alphabet) + word[index + 1:]
+        elif index < len(word) - 1:
+            word = word[:index] + word[index + 1] + word[index] + word[index + 2:]
+    return word
+
+
+def synthetic_queries(corpus=MODEL, count=1000, words_per_query=1, max_edits=2, seed=0):
+    """Misspelled queries of `words_per_query` words, drawn with their frequency in the text `corpus`."""
+    with open(corpus, "r") as f:
+        words = [word for word in text_to_word_sequence(f.read()) if word.isalpha()]
+    alphabet = sorted(set("".join(words)))
+    rng = random.Random(seed)
+    return [" ".join(misspell(rng.choice(words), rng.randint(0, max_edits), alphabet, rng)
+                     for _ in range(words_per_query)) for _ in range(count)]
+
+
+def read_query_log(path):
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentile(sorted_values, q):
+    """Nearest rank `q` percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(int(math.ceil(q * len(sorted_values) / 100)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _init_worker(spell):
+    global _spell
+    _spell = spell
+
+
+def _serve(spell, queries, schedule, language, compound, options):
+    """Runs `queries` at the `schedule` (time.monotonic() values).
+
+    # Returns
+        (latencies, errors), errors is {exception type name: (count, scheduled time, repr)} of the first
+        exception of each type.
+    """
+    latencies = []
+    errors = {}
+    for query, scheduled in zip(queries, schedule):
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            if compound:
+                spell.lookup_compound(query, language, options=options)
+            else:
+                spell.lookup(query, language, options=options)
+        except Exception as e:
+            count, first_scheduled, first = errors.get(type(e).__name__, (0, scheduled, repr(e)))
+            errors[type(e).__name__] = (count + 1, first_scheduled, first)
+        latencies.append(time.monotonic() - scheduled)
+    return latencies, errors
+
+
+def merge_errors(worker_errors):
+    """Errors of several `_serve` calls: counts are summed, the earliest exception of each type is kept."""
+    merged = {}
+    for errors in worker_errors:
+        for name, (count, scheduled, first) in errors.items():
+            total, first_scheduled, kept = merged.get(name, (0, scheduled, first))
+            if scheduled < first_scheduled:
+                first_scheduled, kept = scheduled, first
+            merged[name] = (total + count, first_scheduled, kept)
+    return merged
+
+
+def _serve_process(queries, schedule, language, compound, options):
+    start = resource.getrusage(resource.RUSAGE_SELF)
+    latencies, errors = _serve(_spell, queries, schedule, language, compound, options)
+    end = resource.getrusage(resource.RUSAGE_SELF)
+    return latencies, errors, end.ru_utime + end.ru_stime - start.ru_utime - start.ru_stime, end.ru_maxrss * RSS_UNIT
+
+
+class LoadReport(object):
+    """Latencies (seconds), throughput and resource use of a load test.
+
+    `errors` is the number of failed queries, `first_errors` the {exception type name: (count, repr)} of the
+    first exception of each type.
+    """
+
+    def __init__(self, latencies, errors, elapsed, target_qps, cpu_seconds, max_rss):
+        latencies = sorted(latencies)
+        self.queries = len(latencies)
+        self.errors = sum(count for count, _, _ in errors.values())
+        self.first_errors = {name: (count, first) for name, (count, _, first) in errors.items()}
+        self.elapsed = elapsed
+        self.target_qps = target_qps
+        self.throughput = self.queries / elapsed if elapsed else 0.0
+        self.latencies = {name: percentile(latencies, q) for name, q in PERCENTILES}
+        self.max_latency = latencies[-1] if latencies else None
+        self.cpu_seconds = cpu_seconds
+        self.cpu_utilisation = cpu_seconds / elapsed if elapsed else 0.0  # 1.0 is one busy CPU
+        self.max_rss = max_rss  # bytes, peak resident set of the serving process(es)
+
+    def violations(self, objectives):
+        """Objectives {percentile name: max seconds} which were not met, with the measured latency."""
+        return {name: self.latencies[name] for name, limit in objectives.items()
+                if self.latencies[name] is None or self.latencies[name] > limit}
+
+    def __str__(self):
+        latencies = ", ".join("{} {:.2f} ms".format(name, self.latencies[name] * 1000) for name, _ in PERCENTILES
+                              if self.latencies[name] is not None)
+        return "{} queries ({} errors) in {:.2f} s: {:.1f} qps for {} targeted, {}, max {:.2f} ms, " \
+               "cpu {:.2f} s ({:.0%}), max rss {:.1f} MB".format(self.queries, self.errors, self.elapsed,
+                                                                  self.throughput, self.target_qps, latencies,
+                                                                  (self.max_latency or 0) * 1000, self.cpu_seconds,
+                                                                  self.cpu_utilisation, self.max_rss / 2 ** 20) + \
+            "".join("\n--- {} x {}, first: {} ---".format(count, name, first)
+                    for name, (count, first) in sorted(self.first_errors.items()))
+
+
+class LoadTest(object):
+    """Replays `queries` against `spell` at `qps` queries per second.
+
+    # Arguments
+        spell: The SySpellCompound index.
+        language: Language of the queries.
+        queries: Query strings, cycled until `duration` when it is longer than the queries last.
+        qps: Target rate, the queries are spread evenly over `workers`.
+        workers: Number of threads, or of processes when `processes`.
+        processes: Serve from forked processes sharing the index copy-on-write, threads otherwise (one
+            process and its GIL, like `service.SpellService`).
+        compound: Send the queries to `lookup_compound` instead of `lookup`.
+        options: LookupOptions of the queries, None for the index settings.
+        duration: Seconds to run, defaults to one pass over the queries.
+    """
+
+    def __init__(self, spell, language, queries, qps, workers=1, processes=False, compound=False, options=None,
+                 duration=None):
+        self.spell = spell
+        self.language = language
+        self.queries = list(queries)
+        self.qps = qps
+        self.workers = workers
+        self.processes = processes
+        self.compound = compound
+        self.options = options
+        self.duration = duration
+
+    def plan(self, start):
+        """Per worker (queries, scheduled start times), from `start` on the time.monotonic() clock."""
+        count = len(self.queries) if self.duration is None else int(self.duration * self.qps)
+        plans = [([], []) for _ in range(self.workers)]
+        for i in range(count):
+            queries, schedule = plans[i % self.workers]
+            queries.append(self.queries[i % len(self.queries)])
+            schedule.append(start + i / self.qps)
+        return plans
+
+    def run(self):
+        if self.processes:
+            return self._run_processes()
+        return self._run_threads()
+
+    def _run_threads(self):
+        results = [None] * self.workers
+        start_usage = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.monotonic() + 0.05
+        threads = []
+        for worker, (queries, schedule) in enumerate(self.plan(start)):
+            def serve(worker=worker, queries=queries, schedule=schedule):
+                results[worker] = _serve(self.spell, queries, schedule, self.language, self.compound, self.options)
+            threads.append(threading.Thread(target=serve, daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+        end_usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu_seconds = end_usage.ru_utime + end_usage.ru_stime - start_usage.ru_utime - start_usage.ru_stime
+        return LoadReport(latencies=[latency for latencies, _ in results for latency in latencies],
+                          errors=merge_errors(errors for _, errors in results), elapsed=elapsed,
+                          target_qps=self.qps,
+                          cpu_seconds=cpu_seconds, max_rss=end_usage.ru_maxrss * RSS_UNIT)
+
+    def _run_processes(self):
+        context = multiprocessing.get_context("fork")
+        with context.Pool(self.workers, initializer=_init_worker, initargs=(self.spell,)) as pool:
+            # Workers are forked before the clock starts so that their startup is not measured
+            pool.map(time.sleep, [0.01] * self.workers)
+            start = time.monotonic() + 0.05
+            pending = [pool.apply_async(_serve_process, (queries, schedule, self.language, self.compound,
+                                                         self.options))
+                       for queries, schedule in self.plan(start)]
+            results = [result.get() for result in pending]
+            elapsed = time.monotonic() - start
+        return LoadReport(latencies=[latency for latencies, _, _, _ in results for latency in latencies],
+                          errors=merge_errors(result[1] for result in results), elapsed=elapsed,
+                          target_qps=self.qps,
+                          cpu_seconds=sum(result[2] for result in results),
+                          max_rss=max(result[3] for result in results))
+
+
+def parse_objectives(values):
+    """{"p99": 0.02} from ["p99=20"] (milliseconds)."""
+    objectives = {}
+    for value in values:
+        name, limit = value.split("=")
+        if name not in dict(PERCENTILES):
+            raise ValueError("Unknown percentile {}, use one of {}".format(name, ", ".join(dict(PERCENTILES))))
+        objectives[name] = float(limit) / 1000
+    return objectives
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dictionary", help="Frequency dictionary (term count per line), else the text corpus")
+    parser.add_argument("--corpus", default=MODEL, help="Text the index and the synthetic queries are built from")
+    parser.add_argument("--language", default="fr")
+    parser.add_argument("--log", help="Query log to replay, one query per line, else synthetic misspellings")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of synthetic queries")
+    parser.add_argument("--words", type=int, default=1, help="Words per synthetic query")
+    parser.add_argument("--compound", action="store_true", help="Query lookup_compound instead of lookup")
+    parser.add_argument("--edit-distance", type=int, default=2)
+    parser.add_argument("--qps", type=float, default=100)
+    parser.add_argument("--duration", type=float, help="Seconds to run, defaults to one pass over the queries")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--processes", action="store_true", help="Serve from processes instead of threads")
+    parser.add_argument("--slo", nargs="*", default=[], help="Latency objectives such as p99=20 (milliseconds)")
+    args = parser.parse_args(argv)
+
+    spell = SySpellCompound()
+    spell.edit_distance_max = args.edit_distance
+    start_time = time.time()
+    if args.dictionary:
+        spell.load_dictionary(args.dictionary, language=args.language, term_index=0, count_index=1)
+    else:
+        spell.create_dictionary(args.corpus, language=args.language)
+    print("--- index built in {:.2f} s ---".format(time.time() - start_time))
+
+    if args.log:
+        queries = read_query_log(args.log)
+    else:
+        queries = synthetic_queries(corpus=args.corpus, count=args.queries, words_per_query=args.words,
+                                    max_edits=args.edit_distance)
+    options = LookupOptions(edit_distance_max=args.edit_distance)
+    report = LoadTest(spell, args.language, queries, qps=args.qps, workers=args.workers, processes=args.processes,
+                      compound=args.compound, options=options, duration=args.duration).run()
+    print(report)
+    violations = report.violations(parse_objectives(args.slo))
+    for name, latency in sorted(violations.items()):
+        print("--- {} objective missed: {} ---".format(name, "no query" if latency is None else
+                                                         "{:.2f} ms".format(latency * 1000)))
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
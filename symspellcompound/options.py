@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+"""Per-call lookup configuration."""
+from collections import namedtuple
+
+
+class LookupOptions(namedtuple("LookupOptions", ["verbose", "enable_compound_check", "edit_distance_max"])):
+    """Immutable options of a `lookup` / `lookup_compound` call, overriding the index defaults.
+
+    verbose: 0 top suggestion, 1 all suggestions of smallest edit distance, 2 all suggestions <= edit distance.
+    enable_compound_check: Whether `lookup_compound` merges and splits terms.
+    edit_distance_max: Used when the call does not give one, None falls back to the index setting.
+    """
+    __slots__ = ()
+
+    def __new__(cls, verbose=0, enable_compound_check=True, edit_distance_max=None):
+        return super(LookupOptions, cls).__new__(cls, verbose, enable_compound_check, edit_distance_max)
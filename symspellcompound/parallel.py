@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""Process-parallel `lookup_compound` for long documents.
+
+The classified tokens are cut into windows, preferably ending on a sentence end. Each window is corrected
+by a worker process, starting `overlap` tokens before the window so that the merge decisions at its start
+are replayed. The coordinator stitches consecutive runs at the first overlapping token after which both
+are in the same state (see `SySpellCompound.compound_parts`); a window whose runs never agree is resumed
+sequentially from the previous one. The result is therefore the sequential one.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .options import LookupOptions
+
+SENTENCE_ENDS = (".", "!", "?", "…")
+
+_spell = None
+
+
+def _init_worker(spell):
+    global _spell
+    _spell = spell
+
+
+def _correct_window(tokens, language, options):
+    return _spell.compound_parts(tokens=tokens, language=language, options=options)
+
+
+def _state_key(state):
+    count, last_combi, part = state
+    return last_combi, part.term, part.distance, part.count
+
+
+def split_windows(tokens, chunk_size, sentence_ends=SENTENCE_ENDS):
+    """[start, end) token ranges of about `chunk_size` tokens, ending on a sentence end when there is one."""
+    windows = []
+    start = 0
+    while start < len(tokens):
+        end = min(start + chunk_size, len(tokens))
+        if end < len(tokens):
+            for index in range(end - 1, start + chunk_size // 2 - 1, -1):
+                if tokens[index].text.endswith(sentence_ends):
+                    end = index + 1
+                    break
+        windows.append((start, end))
+        start = end
+    return windows
+
+
+class DocumentCorrector(object):
+    """Corrects long documents with a pool of processes sharing `spell`.
+
+    With the fork start method the index is inherited copy-on-write, otherwise it is pickled once per worker.
+    # Arguments
+        spell: The SySpellCompound index.
+        processes: Number of worker processes, defaults to the number of CPUs.
+        chunk_size: Tokens per window.
+        overlap: Tokens replayed before each window, at least 1 for the runs to be stitched.
+    """
+
+    def __init__(self, spell, processes=None, chunk_size=200, overlap=8):
+        if overlap < 1:
+            raise ValueError("DocumentCorrector needs an overlap of at least 1 token")
+        self.spell = spell
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.executor = ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                            initializer=_init_worker, initargs=(spell,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def lookup_compound(self, document, language, edit_distance_max=None, options=None):
+        """Same suggestion as `spell.lookup_compound(document, ...)`."""
+        spell = self.spell
+        _, compound_check, edit_distance_max = spell.resolve_options(options=options,
+                                                                     edit_distance_max=edit_distance_max)
+        options = LookupOptions(verbose=0, enable_compound_check=compound_check, edit_distance_max=edit_distance_max)
+        tokens = spell.classify_tokens(input_string=document, language=language)
+
+        windows = split_windows(tokens, self.chunk_size)
+        futures = []
+        for start, end in windows:
+            first = max(start - self.overlap, 0)
+            futures.append((first, self.executor.submit(_correct_window, tokens[first:end], language, options)))
+
+        parts, part_tokens, states = [], [], []  # states indexed by token
+        for (start, end), (first, future) in zip(windows, futures):
+            run_parts, run_part_tokens, run_states = future.result()
+            if start == 0:
+                parts, part_tokens, states = run_parts, run_part_tokens, run_states
+                continue
+            sync = None
+            for index in range(first, start):
+                # The run and the stitched result agree after token `index`: keep the run from there on
+                if _state_key(run_states[index - first]) == _state_key(states[index]):
+                    sync = index
+                    break
+            if sync is not None:
+                kept = states[sync][0] - 1
+                offset = kept - (run_states[sync - first][0] - 1)
+                del parts[kept:], part_tokens[kept:], states[sync + 1:]
+                parts.extend(run_parts[run_states[sync - first][0] - 1:])
+                part_tokens.extend(run_part_tokens[run_states[sync - first][0] - 1:])
+                states.extend((count + offset, last_combi, part)
+                              for count, last_combi, part in run_states[sync + 1 - first:])
+            else:
+                _, _, resumed_states = spell.compound_parts(tokens=tokens[:end], language=language, options=options,
+                                                            start=start, suggestion_parts=parts,
+                                                            part_tokens=part_tokens, last_combi=states[-1][1])
+                states.extend(resumed_states)
+
+        return spell.join_parts(suggestion_parts=parts, part_tokens=part_tokens, input_string=document)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""Noisy-channel ranking of suggestions: P(word) x P(typo | word).
+
+P(typo | word) comes from a per-character confusion table (substitution, insertion, deletion and
+transposition costs, as -log probabilities) seeded from the keyboard geometry of `data.py` and refined
+with (misspelling, correction) pairs. Costs are stored in dense NumPy arrays so that a whole candidate
+list is scored by one weighted Damerau-Levenshtein pass vectorized over the candidates.
+"""
+import numpy as np
+
+from .kernels import encode as code_points
+from .tools import sort_suggestion
+
+OTHER = 0  # index of the characters outside of the table, they share its costs but still only match themselves
+
+
+def align(source, target):
+    """Edit operations turning `target` (intended) into `source` (typed), from a Damerau-Levenshtein backtrace.
+    # Returns
+        A list of ("sub", intended, typed), ("del", intended, None), ("ins", None, typed) or
+        ("trans", intended pair, typed pair); matches are left out.
+    """
+    rows, cols = len(target) + 1, len(source) + 1
+    d = [[0] * cols for _ in range(rows)]
+    for i in range(rows):
+        d[i][0] = i
+    for j in range(cols):
+        d[0][j] = j
+    for i in range(1, rows):
+        for j in range(1, cols):
+            cost = 0 if target[i - 1] == source[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and target[i - 1] == source[j - 2] and target[i - 2] == source[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+
+    operations = []
+    i, j = rows - 1, cols - 1
+    while i > 0 or j > 0:
+        if i > 1 and j > 1 and target[i - 1] == source[j - 2] and target[i - 2] == source[j - 1] and \
+                target[i - 1] != target[i - 2] and d[i][j] == d[i - 2][j - 2] + 1:
+            operations.append(("trans", target[i - 2:i], source[j - 2:j]))
+            i, j = i - 2, j - 2
+        elif i > 0 and j > 0 and d[i][j] == d[i - 1][j - 1] + (target[i - 1] != source[j - 1]):
+            if target[i - 1] != source[j - 1]:
+                operations.append(("sub", target[i - 1], source[j - 1]))
+            i, j = i - 1, j - 1
+        elif i > 0 and d[i][j] == d[i - 1][j] + 1:
+            operations.append(("del", target[i - 1], None))
+            i -= 1
+        else:
+            operations.append(("ins", None, source[j - 1]))
+            j -= 1
+    return operations[::-1]
+
+
+class NoisyChannelRanker(object):
+    """Ranks suggestions by log(count) - cost(typo | word), see `SySpellCompound.ranker`.
+
+    # Arguments
+        alphabet: Characters of the table, the others share one "other" row.
+        error_rate: Prior probability of a typo on a character.
+        prior_weight: Weight, in observations per character, of the prior against learned pairs.
+    """
+
+    def __init__(self, alphabet, error_rate=0.01, prior_weight=10.0):
+        self.index = {c: i + 1 for i, c in enumerate(sorted(set(alphabet)))}
+        self.points = np.array([ord(c) for c in sorted(self.index)], dtype=np.int64)
+        self.error_rate = error_rate
+        self.prior_weight = prior_weight
+        size = len(self.index) + 1
+        # Observation counts, the prior is added as pseudo-counts, costs are derived by `compile`
+        self.char_counts = np.full(size, prior_weight)
+        self.sub_counts = np.full((size, size), prior_weight * error_rate / (2 * size))
+        self.del_counts = np.full(size, prior_weight * error_rate / 4)
+        self.ins_counts = np.full(size, prior_weight * error_rate / 4)
+        self.trans_counts = np.full(size, prior_weight * error_rate / 8)
+        self.compile()
+
+    @classmethod
+    def from_keyboard(cls, layout="AZERTY", error_rate=0.01, prior_weight=10.0, extra_characters=""):
+        """Table whose substitution prior decreases with the distance between keys of `layout`."""
+        from .data import simple_layout
+
+        coords = simple_layout[layout]
+        ranker = cls(alphabet=[c for c in coords if c.strip()] + list(extra_characters) + [" "],
+                     error_rate=error_rate, prior_weight=prior_weight)
+        chars = sorted(ranker.index, key=ranker.index.get)
+        positions = np.array([coords.get(c, (4, 5)) for c in chars], dtype=float)
+        distances = np.sqrt(((positions[:, None, :] - positions[None, :, :]) ** 2).sum(axis=2))
+        weights = np.exp(-distances)
+        np.fill_diagonal(weights, 0.0)
+        weights /= weights.sum(axis=1, keepdims=True)
+        # Keep some mass for far away keys (phonetic or cognitive errors)
+        weights = 0.9 * weights + 0.1 / (len(chars) - 1)
+        np.fill_diagonal(weights, 0.0)
+        ranker.sub_counts[1:, 1:] = prior_weight * error_rate / 2 * weights
+        ranker.compile()
+        return ranker
+
+    def encode(self, term):
+        return [self.index.get(c, OTHER) for c in term]
+
+    def table_codes(self, points):
+        """`encode` of an array of code points."""
+        found = np.minimum(np.searchsorted(self.points, points), len(self.points) - 1)
+        return np.where(self.points[found] == points, found + 1, OTHER)
+
+    def learn(self, pairs):
+        """Adds (misspelling, correction) pairs to the observation counts and recompiles the costs."""
+        for misspelling, correction in pairs:
+            for c in self.encode(correction):
+                self.char_counts[c] += 1
+            for operation, intended, typed in align(misspelling, correction):
+                if operation == "sub":
+                    self.sub_counts[self.index.get(intended, OTHER), self.index.get(typed, OTHER)] += 1
+                elif operation == "del":
+                    self.del_counts[self.index.get(intended, OTHER)] += 1
+                elif operation == "ins":
+                    self.ins_counts[self.index.get(typed, OTHER)] += 1
+                else:
+                    self.trans_counts[self.index.get(intended[0], OTHER)] += 1
+        self.compile()
+        return self
+
+    def learn_file(self, path, separator=None):
+        """Learns from a file of "misspelling correction" lines."""
+        with open(path, "r") as f:
+            pairs = [line.split(separator)[:2] for line in f if len(line.split(separator)) >= 2]
+        return self.learn(pairs)
+
+    def compile(self):
+        """Turns counts into the dense -log probability cost arrays used by `costs`."""
+        chars = self.char_counts
+        with np.errstate(divide="ignore"):
+            # A character matching itself costs nothing, the diagonal is the cost between two other characters
+            self.sub_cost = -np.log(self.sub_counts / chars[:, None])
+        self.del_cost = -np.log(self.del_counts / chars)
+        self.ins_cost = -np.log(self.ins_counts / chars.sum())
+        self.trans_cost = -np.log(self.trans_counts / chars)
+
+    def costs(self, query, terms):
+        """-log P(query | term) of every term, one character of the terms at a time for all terms at once."""
+        if not len(terms):
+            return np.zeros(0)
+        typed_points = np.array([ord(c) for c in query], dtype=np.int64)
+        typed = self.table_codes(typed_points)
+        # Matches are decided on the characters, their table indexes only give the costs
+        points, lengths = code_points(terms)
+        codes = self.table_codes(points)
+
+        insertions = np.concatenate(([0.0], np.cumsum(self.ins_cost[typed])))
+        previous2 = None
+        previous = np.tile(insertions, (len(terms), 1))
+        result = previous[:, -1].copy()
+        for j in range(points.shape[1]):
+            intended = codes[:, j]
+            equal = points[:, j, None] == typed_points[None, :]
+            # Deletion and substitution (or match), the insertions are chained along the row below
+            current = previous + self.del_cost[intended][:, None]
+            substitutions = np.where(equal, 0.0, self.sub_cost[intended[:, None], typed[None, :]])
+            np.minimum(current[:, 1:], previous[:, :-1] + substitutions, out=current[:, 1:])
+            if previous2 is not None and len(typed) > 1:
+                swapped = equal[:, :-1] & (points[:, j - 1, None] == typed_points[None, 1:]) & \
+                          (points[:, j, None] != points[:, j - 1, None])
+                transpositions = previous2[:, :-2] + self.trans_cost[codes[:, j - 1]][:, None]
+                np.minimum(current[:, 2:], np.where(swapped, transpositions, np.inf), out=current[:, 2:])
+            # current[i] = min over k <= i of current[k] + the insertions of typed[k:i]
+            current -= insertions
+            np.minimum.accumulate(current, axis=1, out=current)
+            current += insertions
+            previous2, previous = previous, current
+            done = lengths == j + 1
+            result[done] = current[done, -1]
+        return result
+
+    def scores(self, query, suggestions):
+        costs = self.costs(query, [si.term for si in suggestions])
+        counts = np.array([max(si.count, 1) for si in suggestions], dtype=float)
+        return np.log(counts) - costs
+
+    def rank(self, query, suggestions):
+        """Suggestions sorted by decreasing noisy-channel score."""
+        if len(suggestions) < 2:
+            return suggestions
+        scores = self.scores(query, suggestions)
+        order = {id(si): -score for si, score in zip(suggestions, scores)}
+        return sort_suggestion(suggestions, fonction=lambda x: order[id(x)])
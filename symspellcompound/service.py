@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""Long-running wrapper allowing dictionaries to be hot-swapped without restarting."""
+import gc
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+from .symspellcompound import SySpellCompound
+
+RETIRE_CHUNK = 10000  # entries freed between two GIL releases when tearing down a retired index
+
+
+class IndexHandle(object):
+    """Reference-counted holder of a SySpellCompound index.
+
+    The service keeps one reference on the current handle and every in-flight request holds another one.
+    When the handle has been swapped out and the last request releases it, the index is handed to `retire`
+    so its memory can be reclaimed without waiting for the garbage collector to find the handle.
+    """
+
+    def __init__(self, spell, generation, retire=None):
+        self.spell = spell
+        self.generation = generation
+        self.refs = 1
+        self._retire = retire
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.refs == 0:
+                return False
+            self.refs += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.refs -= 1
+            if self.refs > 0:
+                return
+            # The list is the last reference to the index, whoever empties it frees the index
+            retired = [self.spell]
+            self.spell = None
+        if self._retire is not None:
+            self._retire(retired)
+
+
+def teardown(spell, chunk_size=RETIRE_CHUNK):
+    """Empties the dicts and lists of `spell` `chunk_size` entries at a time, yielding the GIL in between.
+
+    Dropping millions of entries at once runs as one bytecode and stalls every other thread for the whole
+    free. Structures also referenced from elsewhere (the source of a frozen index) are left untouched.
+    """
+    for name in list(vars(spell)):
+        structure = vars(spell)[name]
+        if isinstance(structure, MappingProxyType):
+            structure = gc.get_referents(structure)[0]  # the dict behind a frozen index
+        # References: the attribute (or the proxy), `structure` and the getrefcount argument
+        if sys.getrefcount(structure) > 3:
+            continue
+        if isinstance(structure, dict):
+            while structure:
+                for _ in range(min(chunk_size, len(structure))):
+                    structure.popitem()
+                time.sleep(0)
+        elif isinstance(structure, list):
+            while structure:
+                del structure[-chunk_size:]
+                time.sleep(0)
+
+
+class SpellService(object):
+    """Serves lookups from a SySpellCompound index which can be atomically replaced.
+
+    In-flight `lookup` and `lookup_compound` calls finish against the index they started with; calls issued
+    after `swap` see the new one. Indexes are built in a background thread by `build_in_background` or
+    `load_in_background` and swapped in once complete.
+    """
+
+    def __init__(self, spell=None):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._handle = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Retired indexes are torn down by their own thread, not after a build in progress
+        self._retired = queue.Queue()
+        self._retirer = threading.Thread(target=self._retire_loop, name="SpellService-retire", daemon=True)
+        self._retirer.start()
+        if spell is not None:
+            self.swap(spell)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def acquire(self):
+        """Returns the current handle with a reference taken, callers must `release` it."""
+        while True:
+            with self._lock:
+                handle = self._handle
+            if handle is None:
+                raise RuntimeError("SpellService has no index loaded")
+            # A swap may retire the handle between both steps, then retry with the new one
+            if handle.acquire():
+                return handle
+
+    def swap(self, spell):
+        """Atomically makes `spell` the served index and returns its generation."""
+        with self._lock:
+            self._generation += 1
+            previous = self._handle
+            self._handle = IndexHandle(spell, self._generation, retire=self._retire)
+            generation = self._generation
+        if previous is not None:
+            previous.release()
+        return generation
+
+    def _retire(self, retired):
+        self._retired.put(retired)
+
+    def _retire_loop(self):
+        while True:
+            retired = self._retired.get()
+            if retired is None:
+                return
+            teardown(retired[0])
+            del retired[:]
+
+    def build_in_background(self, factory, *args, **kwargs):
+        """Calls `factory(*args, **kwargs)` in a background thread and swaps in the index it returns.
+
+        Returns a Future resolving to the new generation.
+        """
+        def build():
+            return self.swap(factory(*args, **kwargs))
+
+        return self._executor.submit(build)
+
+    def load_in_background(self, corpus, language, term_index=0, count_index=1, distance="dameraulevenshtein"):
+        """Loads a frequency dictionary into a fresh index in the background, see `build_in_background`."""
+        return self.build_in_background(load_index, corpus=corpus, language=language, term_index=term_index,
+                                        count_index=count_index, distance=distance)
+
+    def lookup(self, input_string, language, edit_distance_max=None, options=None):
+        handle = self.acquire()
+        try:
+            return handle.spell.lookup(input_string=input_string, language=language,
+                                       edit_distance_max=edit_distance_max, options=options)
+        finally:
+            handle.release()
+
+    def lookup_compound(self, input_string, language, edit_distance_max=None, options=None):
+        handle = self.acquire()
+        try:
+            return handle.spell.lookup_compound(input_string=input_string, language=language,
+                                                edit_distance_max=edit_distance_max, options=options)
+        finally:
+            handle.release()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._retired.put(None)
+        if wait:
+            self._retirer.join()
+
+
+def load_index(corpus, language, term_index=0, count_index=1, distance="dameraulevenshtein"):
+    spell = SySpellCompound(distance=distance)
+    if not spell.load_dictionary(corpus=corpus, language=language, term_index=term_index,
+                                 count_index=count_index):
+        raise IOError("Dictionary {} could not be loaded".format(corpus))
+    return spell
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""Hash-partitioned delete index served by shard processes with scatter-gather lookup.
+
+The coordinator keeps the vocabulary (word list and counts) and runs the `lookup` candidate BFS; the
+deletes produced by `create_dictionary_entry` are partitioned by key hash over N shard servers. Each BFS
+level is probed with one batched request per shard, sent to all shards before any answer is read.
+"""
+import multiprocessing
+import zlib
+from multiprocessing.connection import Client, Listener
+
+from .errors import UnsupportedOperationException
+from .items import DictionaryItem
+from .symspellcompound import SySpellCompound
+
+BATCH_SIZE = 4096
+
+
+def shard_for(key, shards):
+    """Stable (process independent) shard number of an index key."""
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+class ShardStore(object):
+    """Partition of the delete index: key -> [suggestion length, suggestion ids]."""
+
+    def __init__(self):
+        self.deletes = {}
+
+    def add(self, entries, verbose):
+        for key, suggestion_int, suggestion_length in entries:
+            value = self.deletes.get(key, None)
+            if value is None:
+                self.deletes[key] = [suggestion_length, [suggestion_int]]
+                continue
+            if suggestion_int in value[1]:
+                continue
+            # Same rule as SySpellCompound.add_lowest_distance, all kept suggestions have the same length
+            if verbose < 2 and value[0] > suggestion_length:
+                value[0] = suggestion_length
+                value[1] = []
+            if verbose == 2 or len(value[1]) == 0 or value[0] >= suggestion_length:
+                value[1].append(suggestion_int)
+
+    def get(self, keys):
+        return [self.deletes[key][1] if key in self.deletes else None for key in keys]
+
+    def handle(self, message):
+        command, payload = message
+        if command == "add":
+            self.add(*payload)
+            return None
+        if command == "get":
+            return self.get(payload)
+        if command == "size":
+            return len(self.deletes)
+        raise ValueError("Unknown shard command {}".format(command))
+
+
+def _check_authkey(authkey):
+    # Shard messages are pickles: an unauthenticated connection could run arbitrary code
+    if not authkey:
+        raise ValueError("Shard connections need an authkey")
+
+
+def serve_shard(address=("127.0.0.1", 0), authkey=None, ready=None):
+    """Serves one shard over a socket until the coordinator sends `close`.
+
+    The bound address is put on the `ready` queue when given, so ephemeral ports can be used.
+    # Arguments
+        authkey: Secret bytes shared with the coordinator, required.
+    """
+    _check_authkey(authkey)
+    store = ShardStore()
+    with Listener(address, authkey=authkey) as listener:
+        if ready is not None:
+            ready.put(listener.address)
+        with listener.accept() as connection:
+            while True:
+                message = connection.recv()
+                if message[0] == "close":
+                    break
+                connection.send(store.handle(message))
+
+
+class ShardedSpellCompound(SySpellCompound):
+    """SySpellCompound whose delete index lives in shard servers.
+
+    Connects to already running shards (`addresses`) with their `authkey`, or use `spawn_local` to start them
+    as local processes.
+    """
+
+    def __init__(self, addresses, authkey=None, distance="dameraulevenshtein", distance_cache=None):
+        _check_authkey(authkey)
+        super(ShardedSpellCompound, self).__init__(distance=distance, distance_cache=distance_cache)
+        self.connections = [Client(address, authkey=authkey) for address in addresses]
+        self.processes = []
+        self.word_counts = {}  # language + word -> count, the coordinator side of the index
+        self._pending = [[] for _ in self.connections]
+
+    @classmethod
+    def spawn_local(cls, shards, distance="dameraulevenshtein"):
+        authkey = multiprocessing.current_process().authkey
+        ready = multiprocessing.Queue()
+        processes = []
+        addresses = []
+        for _ in range(shards):
+            process = multiprocessing.Process(target=serve_shard, kwargs={"authkey": authkey, "ready": ready},
+                                              daemon=True)
+            process.start()
+            processes.append(process)
+            addresses.append(ready.get())
+        spell = cls(addresses=addresses, authkey=authkey, distance=distance)
+        spell.processes = processes
+        return spell
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def freeze(self):
+        raise UnsupportedOperationException("Shard connections can't be shared between threads")
+
+    def compress_vocabulary(self, block_size=8):
+        raise UnsupportedOperationException("Word ids are stored by the shards")
+
+    def create_dictionary_entry(self, key, language, count, delete_depth=None):
+        count_threshold = 1
+        count_previous = self.word_counts.get(language + key, 0)
+        self.word_counts[language + key] = count_previous + count
+        self.max_length = max(len(key), self.max_length)
+
+        if count_previous + count >= count_threshold > count_previous:
+            self.word_list.append(key)
+            keyint = len(self.word_list) - 1
+            depth = self.edit_distance_max if delete_depth is None else delete_depth
+            for delete in self.edits(word=key, edit_distance=self.edit_distance_max - depth, deletes=set()):
+                shard = shard_for(language + delete, len(self.connections))
+                self._pending[shard].append((language + delete, keyint, len(key)))
+                if len(self._pending[shard]) >= BATCH_SIZE:
+                    self._flush(shard)
+            return True
+        return False
+
+    def _flush(self, shard):
+        if self._pending[shard]:
+            self.connections[shard].send(("add", (self._pending[shard], self.verbose)))
+            self.connections[shard].recv()
+            self._pending[shard] = []
+
+    def flush(self):
+        for shard in range(len(self.connections)):
+            self._flush(shard)
+
+    def load_dictionary(self, corpus, language, term_index, count_index, budget=None, top_words=None):
+        if top_words is not None:
+            raise UnsupportedOperationException("Sharded indexes have no tail store, load without top_words")
+        result = super(ShardedSpellCompound, self).load_dictionary(corpus=corpus, language=language,
+                                                                  term_index=term_index, count_index=count_index,
+                                                                  budget=budget)
+        self.flush()
+        return result
+
+    def create_dictionary(self, corpus, language):
+        result = super(ShardedSpellCompound, self).create_dictionary(corpus=corpus, language=language)
+        self.flush()
+        return result
+
+    def get_entry(self, language, term):
+        return self.fetch_entries(language=language, terms=[term]).get(term)
+
+    def fetch_entries(self, language, terms):
+        self.flush()
+        keys = [[] for _ in self.connections]
+        for term in terms:
+            keys[shard_for(language + term, len(self.connections))].append(term)
+        # Scatter every batch before gathering, so shards work concurrently
+        for shard, shard_terms in enumerate(keys):
+            if shard_terms:
+                self.connections[shard].send(("get", [language + term for term in shard_terms]))
+        entries = {}
+        for shard, shard_terms in enumerate(keys):
+            if not shard_terms:
+                continue
+            for term, suggestions in zip(shard_terms, self.connections[shard].recv()):
+                count = self.word_counts.get(language + term, 0)
+                if suggestions is None and not count:
+                    continue
+                value = DictionaryItem()
+                value.count = count
+                value.suggestions = suggestions or []
+                entries[term] = value
+        return entries
+
+    def word_count(self, language, term):
+        return self.word_counts.get(language + term, 0)
+
+    def suggestion_count(self, language, suggestion_int, term=None):
+        term = self.word_list[suggestion_int] if term is None else term
+        return self.word_counts.get(language + term, None)
+
+    def shard_sizes(self):
+        self.flush()
+        sizes = []
+        for connection in self.connections:
+            connection.send(("size", None))
+            sizes.append(connection.recv())
+        return sizes
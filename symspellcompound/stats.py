@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Memory and build time estimation of an index before building it in full."""
+import math
+import random
+import time
+
+from .symspellcompound import SySpellCompound
+
+
+def _build_sample(words, edit_distance_max):
+    spell = SySpellCompound()
+    spell.edit_distance_max = edit_distance_max
+    start_time = time.perf_counter()
+    for word, count in words:
+        spell.create_dictionary_entry(key=word, language="", count=count)
+    elapsed = time.perf_counter() - start_time
+    return spell.stats(), elapsed
+
+
+def estimate_index(vocabulary, edit_distance_max=2, max_length=None, sample_size=20000, seed=0):
+    """Predicts the size and build time of the index of `vocabulary` from a random sample.
+
+    Deletes are shared between words, so the number of entries grows sub-linearly: it is extrapolated with
+    a power law fitted on two nested samples (half and full). Bytes per entry and per word and build time
+    per word are taken from the full sample.
+    # Arguments
+        vocabulary: Iterable of words or of (word, count) pairs.
+        edit_distance_max: Maximum edit distance of the planned index.
+        max_length: Words longer than this are left out, as they would be by a pre-filtered load.
+        sample_size: Number of words actually indexed.
+        seed: Seed of the sample.
+    # Returns
+        A dict with the vocabulary size, the predicted entries, bytes and build seconds and the sample stats.
+    """
+    words = [(item, 1) if isinstance(item, str) else tuple(item) for item in vocabulary]
+    if max_length is not None:
+        words = [(word, count) for word, count in words if len(word) <= max_length]
+    total = len(words)
+    if total == 0:
+        return {"words": 0, "entries": 0, "bytes": 0, "build_seconds": 0.0, "sample": None}
+
+    sample = random.Random(seed).sample(words, min(sample_size, total))
+    half_stats, _ = _build_sample(sample[:max(len(sample) // 2, 1)], edit_distance_max)
+    stats, elapsed = _build_sample(sample, edit_distance_max)
+
+    scale = total / len(sample)
+    exponent = 1.0
+    if len(sample) > 1 and half_stats["entries"] and stats["entries"] > half_stats["entries"]:
+        exponent = math.log(stats["entries"] / half_stats["entries"]) / math.log(len(sample) / (len(sample) // 2))
+    entries = int(stats["entries"] * scale ** exponent)
+
+    word_bytes = stats["bytes"]["word_list"] / max(stats["words"], 1)
+    entry_bytes = (stats["bytes"]["dictionary"] + stats["bytes"]["item_list"]) / max(stats["entries"], 1)
+    return {
+        "words": total,
+        "entries": entries,
+        "bytes": int(word_bytes * total + entry_bytes * entries),
+        "build_seconds": elapsed * scale,
+        "growth_exponent": exponent,
+        "sample": stats,
+    }
@@ -2,16 +2,23 @@
 
 """Main module."""
 import os
+from collections import deque
+from itertools import chain
 from copy import copy
 import math
-from pyxdameraulevenshtein import damerau_levenshtein_distance, normalized_damerau_levenshtein_distance, \
-    damerau_levenshtein_distance_ndarray, normalized_damerau_levenshtein_distance_ndarray
+from pyxdameraulevenshtein import damerau_levenshtein_distance
 import time
+from types import MappingProxyType
 
-from symspellcompound.errors import DistanceException
-from .tools import text_to_word_sequence, to_int, sort_suggestion
-from .typo_distance import typo_distance
+from symspellcompound.errors import DistanceException, EngineException, FrozenIndexException, NormalizerException
+from .tools import text_to_word_sequence, to_int, sort_suggestion, LazyFunction, deep_sizeof, fold_accents
 from .items import SuggestItem, DictionaryItem
+from .distance_cache import DistanceCache
+from .trie import TrieIndex
+from .vocabulary import FrontCodedVocabulary
+from .classifier import Token, KNOWN, PROTECTED
+from .deletes import expand_deletes, generate_deletes
+from .options import LookupOptions
 
 
 def time_printer(func):
@@ -26,16 +33,33 @@ def time_printer(func):
 
 DISTANCE_MAPPER = {
     "dameraulevenshtein": damerau_levenshtein_distance,
-    "typo": typo_distance
+    # typo_distance pulls NumPy, unidecode and the keyboard tables: only load them on first use
+    "typo": LazyFunction(".typo_distance", "typo_distance")
+}
+
+ENGINES = ("deletes", "trie")
+
+# A lookup level with this many suggestions to verify is checked by one vectorized call, see kernels
+BATCH_MIN = 80
+# lookup_compound results this long get their distance to the input from a banded table, see kernels
+BANDED_MIN = 200
+
+NORMALIZER_MAPPER = {
+    "accents": fold_accents
 }
 
 
 class SySpellCompound(object):
-    def __init__(self, distance="dameraulevenshtein"):
+    def __init__(self, distance="dameraulevenshtein", normalizer=None, distance_cache=None, engine="deletes"):
 
         if not(distance in DISTANCE_MAPPER or callable(distance)):
             raise DistanceException("Distance must be dameraulevenshtein, typo or a function taking two arguments "
                                     "the two words which needs to be compared")
+        if not(normalizer is None or normalizer in NORMALIZER_MAPPER or callable(normalizer)):
+            raise NormalizerException("Normalizer must be None, accents or a function taking a word and returning "
+                                      "its normalized form")
+        if engine not in ENGINES:
+            raise EngineException("Engine must be deletes or trie")
 
         self.enable_compound_check = True
         # false: assumes input string as single term, no compound splitting / decompounding
@@ -58,6 +82,32 @@ class SySpellCompound(object):
         self.word_list = []
         self.item_list = []
         self.max_length = 0
+        self.token_classifier = None  # TokenClassifier run on lookup_compound tokens, None looks every token up
+        # Words are indexed (deletes and lookups) by their normalized form, word_list keeps the original ones
+        self.normalizer = NORMALIZER_MAPPER.get(normalizer, normalizer)
+        self.folded_list = []  # normalized form of each word_list entry, only filled with a normalizer
+        self.ranker = None  # NoisyChannelRanker ordering the suggestions, None sorts by distance and count
+        self.build_report = None  # BuildReport of the last budgeted load_dictionary
+        self.distance_function = DISTANCE_MAPPER.get(distance, distance)
+        exact = distance == "dameraulevenshtein"
+        # DistanceCache of at most `distance_cache` pairs in front of the distance, None computes every pair
+        self.distance_cache = None
+        if distance_cache:
+            # Edit distances ignore common affixes and word order, the other metrics are cached as given
+            self.distance_cache = DistanceCache(self.distance_function, max_size=distance_cache, trim=exact,
+                                                symmetric=exact)
+            self.distance_function = self.distance_cache
+        # Vectorized Damerau-Levenshtein verifying the suggestions of a whole lookup level, NumPy is loaded on its
+        # first use. Other metrics and cached distances are checked pair by pair.
+        self.batch_distance = None
+        if exact and self.distance_cache is None:
+            self.batch_distance = LazyFunction(".kernels", "damerau_levenshtein_batch")
+        # Damerau-Levenshtein of long lookup_compound results, only filled around the diagonal of the table
+        self.banded_distance = LazyFunction(".kernels", "damerau_levenshtein_banded") if exact else None
+        # engine="trie": TrieIndex walked by lookup instead of deletes, the dictionary only holds the words
+        self.trie = TrieIndex(distance=None if exact else self.distance_function) if engine == "trie" else None
+        self.tail_store = None  # hybrid.TailStore of the words loaded without deletes, see load_dictionary
+        self.frozen = False  # set by freeze, the index is then read-only
 
         # self.bigram = {} TODO: Remove it
 
@@ -70,13 +120,18 @@ class SySpellCompound(object):
 
         # @time_printer
 
-    def create_dictionary_entry(self, key, language, count):
+    def check_writable(self):
+        if self.frozen:
+            raise FrozenIndexException("Index was frozen, it can't be modified anymore")
+
+    def create_dictionary_entry(self, key, language, count, delete_depth=None):
+        self.check_writable()
         count_threshold = 1
         count_previous = 0
         result = False
         value = None
         valueo = self.dictionary.get(language + key, None)  # 117
-        if value is not None:
+        if valueo is not None:
             if valueo >= 0:  # 122
                 tmp = valueo
                 value = DictionaryItem()
@@ -101,7 +156,19 @@ class SySpellCompound(object):
             keyint = len(self.word_list) - 1
             result = True
 
-            for delete in self.edits(word=key, edit_distance=0, deletes=set()):  # 163
+            deletes = set()
+            if self.normalizer is not None:
+                folded = self.normalizer(key)
+                self.folded_list.append(folded)
+                if folded != key:
+                    # The folded form points to the word like a delete at distance 0
+                    deletes.add(folded)
+                key = folded
+            if self.trie is not None:
+                self.trie.add(language=language, key=key, word_int=keyint)
+                return result
+            depth = self.edit_distance_max if delete_depth is None else delete_depth
+            for delete in self.edits(word=key, edit_distance=self.edit_distance_max - depth, deletes=deletes):  # 163
                 value2 = self.dictionary.get(language + delete, None)
                 if value2 is not None:
                     if value2 >= 0:
@@ -119,21 +186,52 @@ class SySpellCompound(object):
                     self.dictionary[language + delete] = keyint
         return result
 
-    def load_dictionary(self, corpus, language, term_index, count_index):
+    def load_dictionary(self, corpus, language, term_index, count_index, budget=None, top_words=None):
+        """Loads a frequency dictionary, within `budget` (a BuildBudget) when given.
+
+        A budgeted load reads the whole file first and inserts the most frequent terms; what was dropped is
+        reported in `self.build_report`. With `top_words`, only that many most frequent terms get deletes,
+        the others go to `self.tail_store` which `lookup` searches when the index has no close suggestion.
+        """
+        self.check_writable()
+        if top_words is not None and self.normalizer is not None:
+            raise NormalizerException("top_words does not support a normalizer")
         # path = os.path.join(__file__, corpus)
         path = corpus
         if not os.path.isfile(path=path): return False
+        terms = {}
         for line in SySpellCompound.load_file(path=path):
             tokens = text_to_word_sequence(line)
             if len(tokens) >= 2:
                 key = tokens[term_index]
                 count = to_int(tokens[count_index])
                 if count:
+                    if budget is None and top_words is None:
+                        self.create_dictionary_entry(key=key, language=language, count=count)
+                    else:
+                        terms[key] = terms.get(key, 0) + count
+
+        if top_words is not None:
+            from .hybrid import TailStore  # NumPy is only imported by hybrid indexes
+            if self.tail_store is None:
+                self.tail_store = TailStore()
+            ranked = sorted(terms.items(), key=lambda item: -item[1])
+            for key, count in ranked[top_words:]:
+                self.tail_store.add(language=language, word=key, count=count)
+                self.max_length = max(self.max_length, len(key))
+            self.tail_store.compile()
+            terms = dict(ranked[:top_words])
+            if budget is None:
+                for key, count in terms.items():
                     self.create_dictionary_entry(key=key, language=language, count=count)
-
+        if budget is not None:
+            plan, self.build_report = budget.plan(terms=terms, edit_distance_max=self.edit_distance_max)
+            for key, count, depth in plan:
+                self.create_dictionary_entry(key=key, language=language, count=count, delete_depth=depth)
         return True
 
     def create_dictionary(self, corpus, language):
+        self.check_writable()
         # path = os.path.join(__file__, corpus)
         path = corpus
         if not os.path.isfile(path=path): return False
@@ -149,59 +247,224 @@ class SySpellCompound(object):
             for line in f:
                 yield line
 
+    def word_key(self, suggestion_int):
+        """Indexed form of a word: normalized when the index has a normalizer."""
+        if self.normalizer is None:
+            return self.word_list[suggestion_int]
+        return self.folded_list[suggestion_int]
+
+    def normalize(self, term):
+        return term if self.normalizer is None else self.normalizer(term)
+
     def add_lowest_distance(self, item, suggestion, suggestion_int, delete):
         if self.verbose < 2 and len(item.suggestions) > 0 and (
-                len(self.word_list[item.suggestions[0]]) - len(delete)) > (len(suggestion) - len(delete)):
+                len(self.word_key(item.suggestions[0])) - len(delete)) > (len(suggestion) - len(delete)):
             item.suggestions.clear()
 
         if self.verbose == 2 or len(item.suggestions) == 0 or (
-                    len(self.word_list[item.suggestions[0]]) - len(delete) >= len(suggestion) - len(delete)):
+                    len(self.word_key(item.suggestions[0])) - len(delete) >= len(suggestion) - len(delete)):
             item.suggestions.append(suggestion_int)
         return item
 
     def edits(self, word, edit_distance, deletes):
-        edit_distance += 1
-        if len(word) > 1:
-            for index in range(0, len(word)):
-                delete = word[:index] + word[index + 1:]
-                if delete not in deletes:
-                    deletes.add(delete)
-                    if edit_distance < self.edit_distance_max:
-                        self.edits(word=delete, edit_distance=edit_distance, deletes=deletes)
-        return deletes
-
-    def lookup(self, input_string, language, edit_distance_max):
+        return generate_deletes(word=word, edit_distance_max=self.edit_distance_max - edit_distance, deletes=deletes)
+
+    def get_entry(self, language, term):
+        valueo = self.dictionary.get(language + term, None)
+        if valueo is None:
+            return None
+        if valueo >= 0:
+            value = DictionaryItem()
+            value.suggestions.append(valueo)
+            return value
+        return self.item_list[-valueo - 1]
+
+    def fetch_entries(self, language, terms):
+        """Returns a mapping term -> DictionaryItem for one level of lookup candidates.
+
+        `terms` iterates over the level and is only valid during the call, the local index never reads it.
+        Overridden by indexes which can probe a whole level at once (see sharding).
+        """
+        return LocalEntries(self, language)
+
+    def word_count(self, language, term):
+        """Count of `term` when it is a dictionary word, 0 otherwise (O(1), no candidate generation)."""
+        valueo = self.dictionary.get(language + term, None)
+        if valueo is None or valueo >= 0:
+            return 0 if self.tail_store is None else self.tail_store.count(language=language, term=term)
+        return self.item_list[-valueo - 1].count
+
+    def classify_tokens(self, input_string, language):
+        if self.token_classifier is None:
+            return [Token(text) for text in input_string.split()]
+        return self.token_classifier.tokenize(input_string=input_string, spell=self, language=language)
+
+    def suggestion_count(self, language, suggestion_int, term=None):
+        """Count of word `suggestion_int`, `term` saves decoding it again when the caller already has it."""
+        term = self.word_list[suggestion_int] if term is None else term
+        value = self.dictionary.get(language + term, None)
+        if value is None:
+            return None
+        return self.item_list[-value - 1].count
+
+    def stats(self, sizes=True):
+        """Index statistics for capacity planning.
+
+        Returns a dict with the word and delete counts, the split between int (single suggestion) and
+        DictionaryItem entries, the distribution of suggestion list lengths, the indexed deletes per word
+        length and, unless `sizes` is False (slow on large indexes), the deep byte size of each structure.
+        """
+        int_entries = 0
+        item_entries = 0
+        deletes = 0
+        suggestion_lengths = {}
+        references = {}
+        for valueo in self.dictionary.values():
+            if valueo >= 0:
+                int_entries += 1
+                suggestions = (valueo,)
+            else:
+                item_entries += 1
+                suggestions = self.item_list[-valueo - 1].suggestions
+            if suggestions:
+                deletes += 1
+            suggestion_lengths[len(suggestions)] = suggestion_lengths.get(len(suggestions), 0) + 1
+            for suggestion_int in suggestions:
+                length = len(self.word_list[suggestion_int])
+                references[length] = references.get(length, 0) + 1
+
+        words_per_length = {}
+        for word in self.word_list:
+            words_per_length[len(word)] = words_per_length.get(len(word), 0) + 1
+
+        stats = {
+            "words": len(self.word_list),
+            "entries": len(self.dictionary),
+            "deletes": deletes,
+            "int_entries": int_entries,
+            "item_entries": item_entries,
+            "suggestion_lengths": dict(sorted(suggestion_lengths.items())),
+            "deletes_per_word_length": {length: references.get(length, 0) / count
+                                        for length, count in sorted(words_per_length.items())},
+            "edit_distance_max": self.edit_distance_max,
+            "max_length": self.max_length,
+        }
+        if sizes:
+            # Strings and small ints are shared between structures, count each object once
+            seen = set()
+            stats["bytes"] = {name: deep_sizeof(getattr(self, name), seen=seen)
+                              for name in ("word_list", "folded_list", "dictionary", "item_list", "trie")}
+            stats["bytes"]["total"] = sum(stats["bytes"].values())
+        return stats
+
+    def resolve_options(self, options, edit_distance_max=None):
+        """(verbose, enable_compound_check, edit_distance_max) of a call, instance attributes by default."""
+        if options is None:
+            return self.verbose, self.enable_compound_check, \
+                self.edit_distance_max if edit_distance_max is None else edit_distance_max
+        if edit_distance_max is None:
+            edit_distance_max = self.edit_distance_max if options.edit_distance_max is None \
+                else options.edit_distance_max
+        return options.verbose, options.enable_compound_check, edit_distance_max
+
+    def compress_vocabulary(self, block_size=8):
+        """Stores `word_list` (and `folded_list`) front coded, without one string object per word.
+
+        The words are renumbered in sorted order and every reference to them is rewritten; the index then
+        answers the same. Words added later are kept uncompressed after the others. The vocabulary maps ids
+        to words and, with `word_list.index`, words to ids; the dictionary keys still hold every word (and
+        delete). Each suggestion read decodes part of a block, so lookups are about twice as slow. Meant for
+        large vocabularies whose word list matters more than lookup latency.
+        # Arguments
+            block_size: Words per front coded block, see `vocabulary.FrontCodedVocabulary`.
+        # Returns
+            The FrontCodedVocabulary now used as `word_list`.
+        """
+        self.check_writable()
+        words = list(self.word_list)
+        order = sorted(range(len(words)), key=lambda i: words[i].encode("utf-8"))
+        new_ids = [0] * len(order)
+        for new_id, old_id in enumerate(order):
+            new_ids[old_id] = new_id
+
+        for key, value in self.dictionary.items():
+            if value >= 0:
+                self.dictionary[key] = new_ids[value]
+        for item in self.item_list:
+            item.suggestions = [new_ids[suggestion_int] for suggestion_int in item.suggestions]
+        if self.trie is not None:
+            self.trie.remap(new_ids)
+
+        self.word_list = FrontCodedVocabulary([words[i] for i in order], block_size=block_size)
+        if self.normalizer is not None:
+            folded = list(self.folded_list)
+            self.folded_list = FrontCodedVocabulary([folded[i] for i in order], block_size=block_size)
+        return self.word_list
+
+    def freeze(self):
+        """Immutable index sharing the structures of this one, safe to query from several threads.
+
+        Its defaults are the current `verbose`, `enable_compound_check` and `edit_distance_max`; pass a
+        LookupOptions to `lookup` / `lookup_compound` to change them per call. Freezing is one way: this
+        instance becomes read-only too, adding words raises a FrozenIndexException.
+        """
+        if self.tail_store is not None:
+            self.tail_store.compile()
+        frozen = FrozenSpellCompound(self)
+        self.frozen = True
+        return frozen
+
+    def lookup(self, input_string, language, edit_distance_max=None, options=None):
+        verbose, _, edit_distance_max = self.resolve_options(options=options, edit_distance_max=edit_distance_max)
+        top_only = verbose == 0
+        if self.ranker is not None and top_only:
+            # The most probable suggestion may not be the closest one, collect every distance
+            verbose = 2
+        # Normalized once, candidates and distances then only deal with indexed forms
+        input_string = self.normalize(input_string)
         if len(input_string) - edit_distance_max > self.max_length:
             return []
+        if self.trie is not None:
+            suggestions = self.trie_suggestions(input_string=input_string, language=language, verbose=verbose,
+                                                edit_distance_max=edit_distance_max)
+            return self.order_suggestions(input_string=input_string, language=language, suggestions=suggestions,
+                                          verbose=verbose, top_only=top_only, edit_distance_max=edit_distance_max)
 
-        candidates = []
-        hashset1 = set()
+        candidates = deque()
+        hashset1 = {}  # candidate -> first position its deletes start from, see deletes.expand_deletes
         suggestions = []
         hashset2 = set()
+        # (term, suggestion_int, indexed form) of the level whose distance is to compute, with batch_distance
+        pending = [] if self.batch_distance is not None else None
 
         candidates.append(input_string)
+        hashset1[input_string] = 0
 
+        entries = None
+        level_length = None
         while len(candidates) > 0:
-            candidate = candidates[0]
-            candidates.pop(0)
+            candidate = candidates.popleft()
+            if pending and len(candidate) != level_length:
+                suggestions = self.verify_pending(input_string=input_string, language=language, pending=pending,
+                                                  suggestions=suggestions, verbose=verbose,
+                                                  edit_distance_max=edit_distance_max)
 
-            if self.verbose < 2 and len(suggestions) > 0 and len(input_string) - len(candidate) > suggestions[
+            if verbose < 2 and len(suggestions) > 0 and len(input_string) - len(candidate) > suggestions[
                 0].distance:
                 break  # 302
 
-            valueo = self.dictionary.get(language + candidate, None)
-            if valueo is not None:  # 305
-                value = DictionaryItem()
-                if valueo >= 0:  # 308
-                    value.suggestions.append(int(valueo))
-                else:
-                    value = self.item_list[-valueo - 1]
+            # Candidates are queued level by level: the queue holds the whole level when its first term is popped
+            if len(candidate) != level_length:
+                level_length = len(candidate)
+                entries = self.fetch_entries(language=language, terms=chain((candidate,), candidates))
 
+            value = entries.get(candidate)
+            if value is not None:  # 305
                 if value.count > 0 and candidate not in hashset2:  # 311
                     hashset2.add(candidate)
                     distance = len(input_string) - len(candidate)
-                    if self.verbose == 2 or len(suggestions) == 0 or distance <= suggestions[0].distance:
-                        if self.verbose < 2 and len(suggestions) > 0 and suggestions[0].distance > distance:
+                    if verbose == 2 or len(suggestions) == 0 or distance <= suggestions[0].distance:
+                        if verbose < 2 and len(suggestions) > 0 and suggestions[0].distance > distance:
                             suggestions = []
                         si = SuggestItem()
                         si.term = candidate
@@ -209,13 +472,14 @@ class SySpellCompound(object):
                         si.distance = distance
                         suggestions.append(si)
                         # Early stopping
-                        if self.verbose < 2 and (len(input_string) - len(candidate)) == 0:
+                        if verbose < 2 and (len(input_string) - len(candidate)) == 0:
                             break
                             #  333
                 for suggestion_int in value.suggestions:
-                    suggestion = self.word_list[suggestion_int]
-                    if suggestion not in hashset2:
-                        hashset2.add(suggestion)
+                    term = self.word_list[suggestion_int]
+                    if term not in hashset2:
+                        hashset2.add(term)
+                        suggestion = term if self.normalizer is None else self.folded_list[suggestion_int]
                         distance = 0
                         if suggestion != input_string:
 
@@ -224,78 +488,209 @@ class SySpellCompound(object):
                                 distance = len(input_string) - len(candidate)
                             elif len(input_string) == len(candidate):
                                 distance = len(suggestion) - len(candidate)
+                            elif pending is not None:
+                                pending.append((term, suggestion_int, suggestion))
+                                continue
                             else:
-                                ii = 0
-                                jj = 0
-                                while ii < len(suggestion) and \
-                                        ii < len(input_string) and \
-                                        suggestion[ii] == input_string[ii]: ii += 1
-                                while jj < len(suggestion) - ii and \
-                                        jj < len(input_string) - ii and \
-                                        suggestion[- jj - 1] == input_string[- jj - 1]: jj += 1
-
-                                if ii > 0 or jj > 0:
-                                    distance = distance_between_words(
-                                        suggestion[ii:- ii - jj],
-                                        input_string[ii: - ii - jj])
-                                else:
-                                    distance = distance_between_words(suggestion, input_string)
-                        if self.verbose < 2 and len(suggestions) > 0 and distance > suggestions[0].distance: continue
+                                distance = self.trimmed_distance(suggestion=suggestion, input_string=input_string)
+                        if verbose < 2 and len(suggestions) > 0 and distance > suggestions[0].distance: continue
                         if distance <= edit_distance_max:
-                            value2 = self.dictionary.get(language + suggestion, None)
-                            if value2 is not None:
+                            count = self.suggestion_count(language=language, suggestion_int=suggestion_int, term=term)
+                            if count is not None:
                                 si = SuggestItem()
-                                si.term = suggestion
-                                si.count = self.item_list[-value2 - 1].count
+                                si.term = term
+                                si.count = count
                                 si.distance = distance
 
-                                if self.verbose < 2 and len(suggestions) and suggestions[0].distance > distance:
+                                if verbose < 2 and len(suggestions) and suggestions[0].distance > distance:
                                     suggestions = []
                                 suggestions.append(si)
 
-                if len(input_string) - len(candidate) < edit_distance_max:
-                    if self.verbose < 2 and \
-                            len(suggestions) > 0 and \
-                                len(input_string) - len(candidate) >= suggestions[0].distance:
-                        continue
-
-                    for index in range(0, len(candidate)):
-                        delete = candidate[:index] + candidate[index + 1:]
-                        if delete not in hashset1:
-                            hashset1.add(delete)
-                            candidates.append(delete)
-
-        if self.verbose < 2:
+            if len(input_string) - len(candidate) < edit_distance_max:
+                if verbose < 2 and \
+                        len(suggestions) > 0 and \
+                        len(input_string) - len(candidate) >= suggestions[0].distance:
+                    continue
+
+                # Expanded whether or not the candidate is indexed: deletes of both sides meet deeper
+                candidates.extend(expand_deletes(candidate, hashset1[candidate], hashset1))
+
+        if pending:
+            suggestions = self.verify_pending(input_string=input_string, language=language, pending=pending,
+                                              suggestions=suggestions, verbose=verbose,
+                                              edit_distance_max=edit_distance_max)
+        return self.order_suggestions(input_string=input_string, language=language, suggestions=suggestions,
+                                      verbose=verbose, top_only=top_only, edit_distance_max=edit_distance_max)
+
+    def trimmed_distance(self, suggestion, input_string):
+        ii = 0
+        jj = 0
+        while ii < len(suggestion) and \
+                ii < len(input_string) and \
+                suggestion[ii] == input_string[ii]: ii += 1
+        while jj < len(suggestion) - ii and \
+                jj < len(input_string) - ii and \
+                suggestion[- jj - 1] == input_string[- jj - 1]: jj += 1
+
+        if ii > 0 or jj > 0:
+            return self.distance_function(suggestion[ii:len(suggestion) - jj], input_string[ii:len(input_string) - jj])
+        return self.distance_function(suggestion, input_string)
+
+    def verify_pending(self, input_string, language, pending, suggestions, verbose, edit_distance_max):
+        """Adds the `pending` suggestions of a lookup level within the distance, one batch for a large level."""
+        if len(pending) >= BATCH_MIN:
+            distances = self.batch_distance(input_string, [suggestion for _, _, suggestion in pending]).tolist()
+        else:
+            distances = [self.trimmed_distance(suggestion=suggestion, input_string=input_string)
+                         for _, _, suggestion in pending]
+        for (term, suggestion_int, _), distance in zip(pending, distances):
+            if verbose < 2 and len(suggestions) > 0 and distance > suggestions[0].distance: continue
+            if distance <= edit_distance_max:
+                count = self.suggestion_count(language=language, suggestion_int=suggestion_int, term=term)
+                if count is not None:
+                    si = SuggestItem()
+                    si.term = term
+                    si.count = count
+                    si.distance = distance
+
+                    if verbose < 2 and len(suggestions) and suggestions[0].distance > distance:
+                        suggestions = []
+                    suggestions.append(si)
+        del pending[:]
+        return suggestions
+
+    def trie_suggestions(self, input_string, language, verbose, edit_distance_max):
+        """Suggestions of the trie engine, with the same selection as the deletes walk of `lookup`."""
+        found = []
+        if verbose < 2:
+            # An exact word only walks its own path and nothing can be closer
+            found = self.trie.search(language=language, term=input_string, edit_distance_max=0)
+        if not found:
+            found = self.trie.search(language=language, term=input_string, edit_distance_max=edit_distance_max,
+                                     closest_only=verbose < 2)
+        suggestions = []
+        for suggestion_int, distance in found:
+            si = SuggestItem()
+            si.term = self.word_list[suggestion_int]
+            si.count = self.suggestion_count(language=language, suggestion_int=suggestion_int, term=si.term)
+            si.distance = distance
+            suggestions.append(si)
+        if verbose < 2 and suggestions:
+            best = min(si.distance for si in suggestions)
+            suggestions = [si for si in suggestions if si.distance == best]
+        return suggestions
+
+    def order_suggestions(self, input_string, language, suggestions, verbose, top_only, edit_distance_max):
+        if self.tail_store is not None:
+            suggestions = self.add_tail_suggestions(input_string=input_string, language=language,
+                                                    suggestions=suggestions, verbose=verbose,
+                                                    edit_distance_max=edit_distance_max)
+
+        if self.ranker is not None:
+            suggestions = self.ranker.rank(input_string, suggestions)
+        elif verbose < 2:
             # sorted(suggestions, key=lambda x: x.count, reverse=True)
-            suggestions = sort_suggestion(suggestions, fonction=lambda x: x.count)
+            suggestions = sort_suggestion(suggestions, fonction=lambda x: -x.count)
         else:
-            suggestions = sort_suggestion(suggestions, fonction=lambda x: 2 * x.distance - x.count)
+            suggestions = sort_suggestion(suggestions, fonction=lambda x: (x.distance, -x.count))
             # sorted(suggestions, key=lambda x: 2 * x.distance - x.count, reverse=True)
 
-        if self.verbose == 0 and len(suggestions) > 1:
+        if top_only and len(suggestions) > 1:
             return suggestions[0:1]
         else:
             return suggestions
 
-    # @time_printer
-    def lookup_compound(self, input_string, language, edit_distance_max):
+    def add_tail_suggestions(self, input_string, language, suggestions, verbose, edit_distance_max):
+        """Completes `suggestions` with the words of the tail store when none is close enough.
+
+        A term that is itself a tail word is always its own suggestion, only the fuzzy search is skipped when
+        the index has a close enough suggestion.
+        """
+        exact_count = self.tail_store.count(language=language, term=input_string)
+        if exact_count:
+            si = SuggestItem()
+            si.term = input_string
+            si.count = exact_count
+            si.distance = 0
+            suggestions.append(si)
+        best = min((si.distance for si in suggestions), default=None)
+        fallback_distance = self.tail_store.fallback_distance
+        if fallback_distance is None:
+            fallback_distance = edit_distance_max - 1
+        if not exact_count and (best is None or best > fallback_distance):
+            bound = edit_distance_max if verbose == 2 or best is None else best
+            for term, count, distance in self.tail_store.search(language=language, term=input_string,
+                                                                edit_distance_max=bound,
+                                                                distance=self.distance_function):
+                si = SuggestItem()
+                si.term = term
+                si.count = count
+                si.distance = distance
+                suggestions.append(si)
+        if verbose < 2 and suggestions:
+            best = min(si.distance for si in suggestions)
+            suggestions = [si for si in suggestions if si.distance == best]
+        return suggestions
 
-        term_list_1 = input_string.split()
+    # @time_printer
+    def lookup_compound(self, input_string, language, edit_distance_max=None, options=None):
+        _, compound_check, edit_distance_max = self.resolve_options(options=options,
+                                                                    edit_distance_max=edit_distance_max)
+        # Terms are always corrected with their top suggestion
+        options = LookupOptions(verbose=0, enable_compound_check=compound_check, edit_distance_max=edit_distance_max)
+
+        tokens = self.classify_tokens(input_string=input_string, language=language)
+        suggestion_parts, part_tokens, _ = self.compound_parts(tokens=tokens, language=language, options=options)
+        return self.join_parts(suggestion_parts=suggestion_parts, part_tokens=part_tokens, input_string=input_string)
+
+    def compound_parts(self, tokens, language, options, start=0, suggestion_parts=None, part_tokens=None,
+                       last_combi=False):
+        """Corrected parts of `lookup_compound` for classified `tokens`, from token `start` on.
+
+        A run is resumed from the parts and `last_combi` left after token `start - 1`.
+        # Returns
+            (suggestion_parts, part_tokens, states): part_tokens holds the (token giving the affixes, source of
+            the casing) of each part and states, for each processed token, the (number of parts, last_combi,
+            last part) right after it. Two runs in the same state after a token give the same parts from there.
+        """
+        compound_check = options.enable_compound_check
+        edit_distance_max = options.edit_distance_max
+        term_list_1 = [token.term for token in tokens]
         suggestions = []
-        suggestion_parts = []
-
-        last_combi = False
+        suggestion_parts = [] if suggestion_parts is None else suggestion_parts
+        part_tokens = [] if part_tokens is None else part_tokens
+        states = []
+
+        for i in range(start, len(term_list_1)):
+            if i > start:
+                states.append((len(suggestion_parts), last_combi, suggestion_parts[-1]))
+            if tokens[i].kind == PROTECTED:
+                si = SuggestItem()
+                si.term = tokens[i].text
+                suggestion_parts.append(si)
+                part_tokens.append((tokens[i], None))
+                # Never merge a protected token with its neighbours
+                last_combi = True
+                continue
 
-        for i in range(0, len(term_list_1)):
             suggestions_previous_term = []
             for k in range(0, len(suggestions)):
                 suggestions_previous_term.append(copy(suggestions[k]))
-            suggestions = self.lookup(input_string=term_list_1[i], language=language,
-                                      edit_distance_max=edit_distance_max)
-            if i > 0 and not last_combi:
+            if tokens[i].kind == KNOWN:
+                si = SuggestItem()
+                si.term = term_list_1[i]
+                si.count = tokens[i].count
+                suggestions = [si]
+            else:
+                suggestions = self.lookup(input_string=term_list_1[i], language=language,
+                                          edit_distance_max=edit_distance_max, options=options)
+            # Two exact words can't be beaten by their combination, skip that lookup. Punctuation between two
+            # tokens ("prob. leme") separates them: their merge would drop it
+            if compound_check and i > 0 and not last_combi and not tokens[i - 1].suffix and \
+                    not tokens[i].prefix and not (tokens[i].kind == KNOWN and suggestion_parts[-1].distance == 0):
                 suggestions_combi = self.lookup(input_string=term_list_1[i - 1] + term_list_1[i],
                                                 language=language,
-                                                edit_distance_max=edit_distance_max)
+                                                edit_distance_max=edit_distance_max, options=options)
                 if len(suggestions_combi) > 0:
                     best1 = suggestion_parts[-1]
                     best2 = SuggestItem()
@@ -306,16 +701,28 @@ class SySpellCompound(object):
                         best2.distance = edit_distance_max + 1
                         best2.count = 0
 
-                    if suggestions_combi[0].distance + 1 < distance_between_words(
-                                term_list_1[i - 1] + " " + term_list_1[i], best1.term + " " + best2.term):
+                    if suggestions_combi[0].distance + 1 < self.distance_function(
+                                self.normalize(term_list_1[i - 1] + " " + term_list_1[i]),
+                                self.normalize(best1.term + " " + best2.term)):
                         suggestions_combi[0].distance += 1
                         suggestion_parts[-1] = suggestions_combi[0]
+                        part_tokens[-1] = (Token(tokens[i - 1].text + " " + tokens[i].text,
+                                                 prefix=tokens[i - 1].prefix, suffix=tokens[i].suffix),
+                                           tokens[i - 1].core)
                         last_combi = True
-                        break
+                        continue
             last_combi = False
+            part_tokens.append((tokens[i], None))
 
-            if len(suggestions) > 0 and (suggestions[0].distance == 0 or len(term_list_1[i]) == 1):
+            if len(suggestions) > 0 and (suggestions[0].distance == 0 or len(term_list_1[i]) == 1 or
+                                         not compound_check):
                 suggestion_parts.append(suggestions[0])
+            elif not compound_check:
+                si = SuggestItem()
+                si.term = term_list_1[i]
+                si.count = 0
+                si.distance = edit_distance_max + 1
+                suggestion_parts.append(si)
             else:
                 suggestions_split = []
                 if len(suggestions) > 0:  # 473
@@ -323,34 +730,37 @@ class SySpellCompound(object):
                 if len(term_list_1[i]) > 1:
                     for j in range(1, len(term_list_1[i])):
                         part1 = term_list_1[i][0:j]
-                        part2 = term_list_1[i][j]
+                        part2 = term_list_1[i][j:]
                         suggestion_split = SuggestItem()
                         suggestions1 = self.lookup(input_string=part1, language=language,
-                                                   edit_distance_max=edit_distance_max)
+                                                   edit_distance_max=edit_distance_max, options=options)
                         if len(suggestions1) > 0:
-                            if len(suggestions) > 0 and suggestions[0].term == suggestions1[0].term:
-                                # if split correction1 == einzelwort correction
-                                break
                             suggestions2 = self.lookup(input_string=part2, language=language,
-                                                       edit_distance_max=edit_distance_max)
-                            if len(suggestions1) > 0:
-                                # if split correction1 == einzelwort correction
-                                if len(suggestions) > 0 and suggestions[0].term == suggestions2[0].term:
-                                    break
+                                                       edit_distance_max=edit_distance_max, options=options)
+                            if len(suggestions2) > 0:
                                 suggestion_split.term = suggestions1[0].term + " " + suggestions2[0].term
-                                suggestion_split.distance = distance_between_words(term_list_1[i],
-                                                                                   suggestions1[
-                                                                                       0].term + " " +
-                                                                                   suggestions2[
-                                                                                       0].term)
+                                suggestion_split.distance = self.distance_function(
+                                    self.normalize(term_list_1[i]),
+                                    self.normalize(suggestions1[0].term + " " + suggestions2[0].term))
                                 suggestion_split.count = min(suggestions1[0].count, suggestions2[0].count)
+                                # if split correction1 or 2 == einzelwort correction, the split has to be closer
+                                # ("leprobleme" is "le probleme", not "probleme")
+                                if len(suggestions) > 0 and \
+                                        suggestions[0].term in (suggestions1[0].term, suggestions2[0].term) and \
+                                        suggestion_split.distance >= suggestions[0].distance:
+                                    break
                                 suggestions_split.append(suggestion_split)
                                 if suggestion_split.distance == 1:
                                     break
+                            elif len(suggestions) > 0 and suggestions[0].term == suggestions1[0].term:
+                                break
                     if len(suggestions_split) > 0:
                         # sorted(suggestions_split, key=lambda x: 2 * x.distance - x.count, reverse=True)
-                        suggestions_split = sort_suggestion(suggestions_split,
-                                                            fonction=lambda x: 2 * x.distance - x.count)
+                        if self.ranker is not None:
+                            suggestions_split = self.ranker.rank(self.normalize(term_list_1[i]), suggestions_split)
+                        else:
+                            suggestions_split = sort_suggestion(suggestions_split,
+                                                                fonction=lambda x: (x.distance, -x.count))
                         suggestion_parts.append(suggestions_split[0])
                     else:
                         si = SuggestItem()
@@ -366,27 +776,84 @@ class SySpellCompound(object):
                     si.distance = edit_distance_max + 1
                     suggestion_parts.append(si)
 
+        if len(tokens) > start:
+            states.append((len(suggestion_parts), last_combi, suggestion_parts[-1]))
+        return suggestion_parts, part_tokens, states
+
+    def join_parts(self, suggestion_parts, part_tokens, input_string):
         suggestion = SuggestItem()
         suggestion.count = math.inf
         s = ""
-        for si in suggestion_parts:
-            s += si.term + " "
-            suggestion.count = min(si.count, suggestion.count)
+        for si, (token, source) in zip(suggestion_parts, part_tokens):
+            s += token.restore(si.term, source=source) + " "
+            if token.kind != PROTECTED:
+                suggestion.count = min(si.count, suggestion.count)
         suggestion.term = s.strip()
-        suggestion.distance = distance_between_words(suggestion.term, input_string)
+        term, input_string = self.normalize(suggestion.term), self.normalize(input_string)
+        if self.banded_distance is None or len(input_string) < BANDED_MIN:
+            suggestion.distance = self.distance_function(term, input_string)
+        else:
+            # The parts' distances add up to about the whole one: start the band there and widen it until the
+            # distance fits, which makes it exact
+            bound = max(sum(si.distance for si in suggestion_parts), 1)
+            suggestion.distance = self.banded_distance(term, input_string, bound)
+            while suggestion.distance > bound:
+                bound *= 2
+                suggestion.distance = self.banded_distance(term, input_string, bound)
 
         # suggestions_line = [suggestion]
         # return suggestions_line
         return suggestion
 
 
+class FrozenSpellCompound(SySpellCompound):
+    """Read-only index returned by `SySpellCompound.freeze`.
+
+    Lookups only read the index and keep their state in locals, so one instance can be shared by the threads
+    of a ThreadPoolExecutor; per-request settings are given as LookupOptions.
+    """
+
+    def __init__(self, spell):
+        set_attribute = super(FrozenSpellCompound, self).__setattr__
+        for name, value in vars(spell).items():
+            set_attribute(name, value)
+        set_attribute("dictionary", MappingProxyType(spell.dictionary))
+        # A compressed vocabulary stays compressed, it is only appended to by create_dictionary_entry
+        for name in ("word_list", "folded_list"):
+            words = getattr(spell, name)
+            set_attribute(name, words if isinstance(words, FrontCodedVocabulary) else tuple(words))
+        set_attribute("item_list", tuple(spell.item_list))
+        set_attribute("frozen", True)
+
+    def __setattr__(self, name, value):
+        raise FrozenIndexException("Frozen index can't be modified, use LookupOptions to change {}".format(name))
+
+    def __delattr__(self, name):
+        raise FrozenIndexException("Frozen index can't be modified")
+
+    def freeze(self):
+        return self
+
+
+class LocalEntries(object):
+    """Lazy view over the entries of a local SySpellCompound dictionary."""
+
+    def __init__(self, spell, language):
+        self.spell = spell
+        self.language = language
+
+    def get(self, term):
+        return self.spell.get_entry(language=self.language, term=term)
+
+
 def distance_between_words(word1, word2):
     return damerau_levenshtein_distance(word1, word2)
     # return typo_distance(s=word1, t=word2, layout='AZERTY')
 
 
 if __name__ == "__main__":
-    ssc = SySpellCompound()
+    # Distance 3 lookups: walk a trie rather than storing the deletes
+    ssc = SySpellCompound(engine="trie")
     print(ssc.load_dictionary("fr_full.txt", language="fr", term_index=0, count_index=1))
     print(ssc.dictionary.get("frprobleme"))
     # print(ssc.create_dictionary("model_fr.txt", "fr"))
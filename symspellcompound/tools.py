@@ -1,3 +1,10 @@
+import importlib
+import sys
+import unicodedata
+
+LIGATURES = str.maketrans({"œ": "oe", "Œ": "OE", "æ": "ae", "Æ": "AE", "ß": "ss"})
+
+
 def sort_suggestion(list_suggest, fonction):
     return list(sorted(list_suggest, key=fonction, reverse=False))
 
@@ -29,3 +36,73 @@ def text_to_word_sequence(text,
     text = text.translate(translate_map)
     seq = text.split(split)
     return [i for i in seq if i]
+
+
+class LazyFunction(object):
+    """Callable proxy importing `module` and resolving `name` on its first call.
+    # Arguments
+        module: Module path, relative paths are resolved against this package.
+        name: Attribute of the module to call.
+    """
+
+    def __init__(self, module, name):
+        self.module = module
+        self.name = name
+        self._function = None
+
+    def resolve(self):
+        if self._function is None:
+            module = importlib.import_module(self.module, package=__package__)
+            self._function = getattr(module, self.name)
+        return self._function
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate deep size in bytes of `obj`, objects in `seen` (ids) are not counted again.
+    # Arguments
+        obj: Object to measure, containers and instance attributes are followed.
+        seen: Optional set of already counted ids, updated in place to share objects between calls.
+    # Returns
+        The size in bytes.
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float)):
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return size
+
+
+def fold_accents(text):
+    """Removes the accents (combining marks) of `text` and expands the common ligatures.
+    # Arguments
+        text: Input text (string).
+    # Returns
+        The folded text, `text` itself when it has nothing to fold.
+    """
+    try:
+        text.encode("ascii")
+        return text
+    except UnicodeEncodeError:
+        pass
+    decomposed = unicodedata.normalize("NFKD", text.translate(LIGATURES))
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return text if folded == text else folded
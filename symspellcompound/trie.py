@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""Trie lookup engine: no deletes are precomputed, `lookup` walks the trie of the words instead.
+
+Each trie node extends the edit distance table of its parent by one row (restricted Damerau-Levenshtein,
+the metric of pyxdameraulevenshtein) and a subtree is pruned as soon as its row exceeds the distance.
+Memory is linear in the vocabulary and any `edit_distance_max` can be queried, at the price of slower
+lookups than the deletes index at distance 1 and 2. See `SySpellCompound(engine="trie")`.
+"""
+
+
+class TrieNode(object):
+    __slots__ = ("children", "words")
+
+    def __init__(self):
+        self.children = {}
+        self.words = None  # word_list indexes of the words ending here
+
+
+class TrieIndex(object):
+    """Tries of the indexed (normalized) words, one per language.
+
+    # Arguments
+        distance: Metric rescoring the words found within the edit distance, None keeps the edit distance.
+    """
+
+    def __init__(self, distance=None):
+        self.distance = distance
+        self.roots = {}
+
+    def add(self, language, key, word_int):
+        node = self.roots.setdefault(language, TrieNode())
+        for char in key:
+            child = node.children.get(char, None)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if node.words is None:
+            node.words = [word_int]
+        else:
+            node.words.append(word_int)
+
+    def remap(self, new_ids):
+        """Replaces every word index i by new_ids[i]."""
+        nodes = list(self.roots.values())
+        while nodes:
+            node = nodes.pop()
+            if node.words is not None:
+                node.words = [new_ids[word_int] for word_int in node.words]
+            nodes.extend(node.children.values())
+
+    def search(self, language, term, edit_distance_max, closest_only=False):
+        """(word_list index, distance) of the words within `edit_distance_max` edits of `term`.
+
+        With `closest_only` the bound shrinks to the closest word found so far: every closest word is
+        returned, farther ones may be too and are to be filtered out.
+        """
+        root = self.roots.get(language, None)
+        if root is None:
+            return []
+        results = []
+        bound = [edit_distance_max]
+        first_row = list(range(len(term) + 1))
+        if root.words is not None:
+            self._match(root, "", term, first_row[-1], results, bound, closest_only)
+        for char, child in root.children.items():
+            self._walk(child, char, "", char, first_row, None, term, results, bound, closest_only)
+        return results
+
+    def _walk(self, node, char, previous_char, prefix, previous_row, previous_previous_row, term, results, bound,
+              closest_only):
+        value = previous_row[0] + 1
+        row = [value]
+        row_min = value
+        transpose = previous_previous_row is not None
+        for column in range(1, len(term) + 1):
+            term_char = term[column - 1]
+            value = min(value + 1, previous_row[column] + 1, previous_row[column - 1] + (term_char != char))
+            if transpose and column > 1 and term_char == previous_char and term[column - 2] == char:
+                value = min(value, previous_previous_row[column - 2] + 1)
+            row.append(value)
+            if value < row_min:
+                row_min = value
+
+        if node.words is not None and row[-1] <= bound[0]:
+            self._match(node, prefix, term, row[-1], results, bound, closest_only)
+        # A transposition below costs at least the substitution in this row: min(row) bounds the subtree
+        if row_min <= bound[0]:
+            for next_char, child in node.children.items():
+                self._walk(child, next_char, char, prefix + next_char, row, previous_row, term, results, bound,
+                           closest_only)
+
+    def _match(self, node, key, term, edit_distance, results, bound, closest_only):
+        distance = edit_distance if self.distance is None else self.distance(key, term)
+        if self.distance is not None and distance > bound[0]:
+            return
+        results.extend((word_int, distance) for word_int in node.words)
+        if closest_only and self.distance is None and edit_distance < bound[0]:
+            bound[0] = edit_distance
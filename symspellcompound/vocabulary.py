@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""Front coded vocabulary: the words of an index without one Python string per word.
+
+The words are sorted and cut in blocks of `block_size`. A block is stored in one shared bytes blob as its
+first word followed, for each next word, by the length of the prefix it shares with the previous one and
+the rest of it, terms being separated by a 0 byte. Reading a word decodes its block up to it, see
+`SySpellCompound.compress_vocabulary`. The other way, a term's id is found by a binary search over the first
+word of each block followed by the decoding of one block (`index`, `in`).
+"""
+from array import array
+import bisect
+
+SEPARATOR = b"\x00"
+MAX_PREFIX = 254  # stored as prefix + 1 in one byte, 0 is the separator
+
+
+class FrontCodedVocabulary(object):
+    """Sequence of terms mapping ids to terms like the `word_list` it replaces, and terms to ids with `index`.
+
+    Terms appended after construction are kept apart, uncompressed, with the next ids.
+    # Arguments
+        terms: The terms, in id order. Sorted terms can also be searched by `index`.
+        block_size: Terms per block, larger blocks are smaller to store and slower to read.
+    """
+
+    def __init__(self, terms, block_size=8):
+        self.block_size = block_size
+        self.offsets = array("L")
+        self.is_sorted = True
+        blob = bytearray()
+        previous = b""
+        count = 0
+        for i, term in enumerate(terms):
+            encoded = term.encode("utf-8")
+            if SEPARATOR in encoded:
+                raise ValueError("Terms of a FrontCodedVocabulary can't contain {!r}".format(SEPARATOR))
+            if encoded < previous:
+                self.is_sorted = False
+            if i % block_size == 0:
+                self.offsets.append(len(blob))
+                prefix = 0
+            else:
+                prefix = 0
+                limit = min(len(previous), len(encoded), MAX_PREFIX)
+                while prefix < limit and previous[prefix] == encoded[prefix]:
+                    prefix += 1
+            blob.append(prefix + 1)
+            blob += encoded[prefix:]
+            blob += SEPARATOR
+            previous = encoded
+            count += 1
+        self.blob = bytes(blob)
+        self.size = count
+        self.appended = []
+        self.appended_ids = {}
+
+    def __len__(self):
+        return self.size + len(self.appended)
+
+    def _block(self, block):
+        end = self.offsets[block + 1] if block + 1 < len(self.offsets) else len(self.blob)
+        return self.blob[self.offsets[block]:end - 1].split(SEPARATOR)
+
+    def __getitem__(self, word_id):
+        if word_id < 0:
+            word_id += len(self)
+        if word_id >= self.size:
+            return self.appended[word_id - self.size]
+        entries = self._block(word_id // self.block_size)
+        term = b""
+        for entry in entries[:word_id % self.block_size + 1]:
+            term = term[:entry[0] - 1] + entry[1:]
+        return term.decode("utf-8")
+
+    def __iter__(self):
+        for block in range(len(self.offsets)):
+            term = b""
+            for entry in self._block(block):
+                term = term[:entry[0] - 1] + entry[1:]
+                yield term.decode("utf-8")
+        for term in self.appended:
+            yield term
+
+    def append(self, term):
+        self.appended_ids.setdefault(term, len(self))
+        self.appended.append(term)
+
+    def _head(self, block):
+        """First term of `block`, encoded."""
+        start = self.offsets[block] + 1
+        return self.blob[start:self.blob.index(SEPARATOR, start)]
+
+    def index(self, term):
+        """Id of `term`, ValueError when it is not in the vocabulary."""
+        if not self.is_sorted:
+            raise ValueError("Only a vocabulary built from sorted terms can be searched")
+        encoded = term.encode("utf-8")
+        block = bisect.bisect_right(_Heads(self), encoded) - 1
+        if block >= 0:
+            current = b""
+            for position, entry in enumerate(self._block(block)):
+                current = current[:entry[0] - 1] + entry[1:]
+                if current == encoded:
+                    return block * self.block_size + position
+                if current > encoded:
+                    break
+        if term in self.appended_ids:
+            return self.appended_ids[term]
+        raise ValueError("{!r} is not in the vocabulary".format(term))
+
+    def __contains__(self, term):
+        try:
+            self.index(term)
+        except ValueError:
+            return False
+        return True
+
+
+class _Heads(object):
+    """Sequence view of the first term of each block for bisect."""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+
+    def __len__(self):
+        return len(self.vocabulary.offsets)
+
+    def __getitem__(self, block):
+        return self.vocabulary._head(block)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Fixtures shared by the tests: small French indexes."""
+
+import pytest
+
+from symspellcompound.symspellcompound import SySpellCompound
+
+WORDS = [("de", 200), ("le", 100), ("avec", 20), ("cette", 15), ("probleme", 10), ("solution", 8), ("prix", 5),
+         ("problemes", 4)]
+
+
+@pytest.fixture
+def words():
+    return list(WORDS)
+
+
+@pytest.fixture
+def make_index():
+    """Factory of French indexes.
+
+    # Arguments
+        words: (word, count) pairs to index, WORDS by default.
+        **arguments: SySpellCompound arguments, such as `engine` or `normalizer`.
+    """
+    def make(words=WORDS, **arguments):
+        spell = SySpellCompound(**arguments)
+        for word, count in words:
+            spell.create_dictionary_entry(key=word, language="fr", count=count)
+        return spell
+    return make
+
+
+@pytest.fixture
+def index(request, make_index):
+    """Index of WORDS, parametrize it indirectly with a dict of SySpellCompound arguments."""
+    return make_index(**getattr(request, "param", {}))
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.budget`."""
+
+from symspellcompound.budget import BuildBudget, deletes_bound
+from symspellcompound.symspellcompound import SySpellCompound
+
+
+def test_deletes_bound():
+    assert deletes_bound(4, 2) == 4 + 6
+    assert deletes_bound(2, 2) == 2
+    assert deletes_bound(8, 2) >= len(SySpellCompound().edits("probleme", 0, set()))
+
+
+def test_budgeted_load(tmpdir):
+    corpus = tmpdir.join("dict.txt")
+    corpus.write("le 100\navec 20\nanticonstitutionnellement 9\ncette 15\nprobleme 10\nsolution 1\n")
+    spell = SySpellCompound()
+    budget = BuildBudget(max_deletes=deletes_bound(2, 2) + deletes_bound(4, 2) + deletes_bound(5, 2) +
+                         deletes_bound(8, 2) + 25, shallow_length=10)
+    assert spell.load_dictionary(str(corpus), "fr", 0, 1, budget=budget)
+
+    report = spell.build_report
+    assert sorted(spell.word_list) == ["anticonstitutionnellement", "avec", "cette", "le", "probleme"]
+    assert (report.words, report.shallow_words, report.dropped_words) == (5, 1, 1)
+    assert report.top_dropped == [("solution", 1)] and report.count_threshold == 1
+    assert len(spell.dictionary) - len(spell.word_list) <= report.deletes_bound
+    assert spell.lookup("anticonstitutionellement", "fr", 2)[0].term == "anticonstitutionnellement"
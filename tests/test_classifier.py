@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.classifier`."""
+
+from symspellcompound.classifier import TokenClassifier, KNOWN, LOOKUP, PROTECTED
+
+
+def test_classify(index):
+    ssc = index
+    classifier = TokenClassifier()
+    kinds = [(token.kind, token.rule) for token in
+             classifier.tokenize("12,50 https://qwant.com a@b.fr #avc ... A380 Avec, problme", ssc, "fr")]
+    assert kinds == [(PROTECTED, "number"), (PROTECTED, "url"), (PROTECTED, "email"), (PROTECTED, "hashtag"),
+                     (PROTECTED, "punctuation"), (PROTECTED, "digits"), (KNOWN, None), (LOOKUP, None)]
+
+
+def test_lookup_compound_keeps_protected_tokens_and_casing(index):
+    ssc = index
+    ssc.token_classifier = TokenClassifier()
+    suggestion = ssc.lookup_compound("Le problme, avc cete SOLUTIN : prix de 12,50 https://x.fr", "fr", 2)
+    assert suggestion.term == "Le probleme, avec cette SOLUTION : prix de 12,50 https://x.fr"
+    assert suggestion.count == 5
+    # Tokens separated by punctuation are not merged, which would drop it
+    assert ssc.lookup_compound("Le prob. leme avec", "fr", 2).term == "Le prix. le avec"
+    assert ssc.lookup_compound("Le prob leme avec", "fr", 2).term == "Le probleme avec"
+
+
+def test_known_words_match_plain_lookup_compound(index):
+    ssc = index
+    expected = ssc.lookup_compound("leprobleme avec cete solution", "fr", 2)
+    ssc.token_classifier = TokenClassifier()
+    suggestion = ssc.lookup_compound("leprobleme avec cete solution", "fr", 2)
+    assert str(suggestion) == str(expected) == "le probleme avec cette solution:8:2"
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.completion`."""
+
+import pytest
+
+from symspellcompound.completion import PrefixIndex
+
+
+@pytest.fixture
+def prefix_index(make_index):
+    return PrefixIndex(make_index([("probleme", 10), ("problemes", 4), ("proche", 30), ("avec", 20), ("prix", 5)]),
+                       "fr")
+
+
+def test_complete(prefix_index):
+    assert prefix_index.complete("probl") == [(10, "probleme"), (4, "problemes")]
+
+
+def test_session_corrects_and_completes(prefix_index):
+    session = prefix_index.session(edit_distance_max=1)
+    assert [s.term for s in session.append("pro")] == ["proche", "probleme", "problemes", "prix"]
+    assert [str(s) for s in session.append("bl")] == ["probleme:10:0", "problemes:4:0"]
+    assert [s.term for s in session.update("prpbl")] == ["probleme", "problemes"]
+    assert session.suggestions()[0].distance == 1
+    assert [s.term for s in session.backspace(4)] == ["proche", "probleme", "prix", "problemes", "avec"]
+    assert session.update("xyzw") == []
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.distance_cache`."""
+
+import pytest
+
+from symspellcompound.distance_cache import DistanceCache, trim_common_affixes
+from symspellcompound.symspellcompound import distance_between_words
+
+
+def test_trim_common_affixes():
+    assert trim_common_affixes("probleme", "problme") == ("e", "")
+    assert trim_common_affixes("avec", "avec") == ("", "")
+
+
+def test_distance_cache():
+    calls = []
+
+    def distance(word1, word2):
+        calls.append((word1, word2))
+        return distance_between_words(word1, word2)
+
+    cache = DistanceCache(distance, max_size=2, trim=True, symmetric=True)
+    assert cache("probleme", "problme") == 1
+    assert cache("problme", "probleme") == 1
+    assert cache("avec", "avc") == 1  # same trimmed pair
+    assert calls == [("", "e")]
+    cache("cette", "cete")
+    cache("solution", "solutin")
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 3, 1)
+    assert stats["hit_rate"] == 2 / 5
+
+
+@pytest.mark.parametrize("index", [{"distance_cache": 1000}], indirect=True)
+def test_cached_lookup(index):
+    spell = index
+    sentence = "le problm avc cete solutin"
+    first = spell.lookup_compound(sentence, "fr", 2)
+    misses = spell.distance_cache.misses
+    second = spell.lookup_compound(sentence, "fr", 2)
+    assert (first.term, first.distance) == (second.term, second.distance) == ("le probleme avec cette solution", 5)
+    assert spell.distance_cache.misses == misses and spell.distance_cache.hits > 0
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.hybrid`."""
+
+from symspellcompound.hybrid import TailStore
+from symspellcompound.options import LookupOptions
+from symspellcompound.symspellcompound import SySpellCompound, distance_between_words
+
+
+def test_tail_store():
+    store = TailStore()
+    for word, count in [("solution", 3), ("solutions", 2), ("absolution", 1), ("pollution", 4)]:
+        store.add("fr", word, count)
+    assert len(store) == 0
+    store.compile()
+    store.add("fr", "solutionner", 1)
+    store.compile()
+    assert len(store) == 5
+    assert store.count("fr", "solutions") == 2 and store.count("fr", "solutio") == 0
+    found = store.search("fr", "soluton", 2, distance_between_words)
+    assert sorted(found) == [("solution", 3, 1), ("solutions", 2, 2)]
+
+
+def test_hybrid_load(tmpdir, monkeypatch):
+    corpus = tmpdir.join("dict.txt")
+    corpus.write("le 100\navec 20\ncette 15\nprobleme 10\nsolution 1\nsolutions 1\n")
+    spell = SySpellCompound()
+    assert spell.load_dictionary(str(corpus), "fr", 0, 1, top_words=4)
+
+    assert sorted(spell.word_list) == ["avec", "cette", "le", "probleme"]
+    assert spell.word_count("fr", "solution") == 1
+    assert not spell.tail_store._pending  # compiled by load_dictionary, lookups only read it
+
+    # Found in the index below the largest distance: the tail is not searched
+    searched = []
+    search = spell.tail_store.search
+
+    def recorded_search(**kwargs):
+        searched.append(kwargs["term"])
+        return search(**kwargs)
+    monkeypatch.setattr(spell.tail_store, "search", recorded_search)
+    assert [s.term for s in spell.lookup("problme", "fr", 2)] == ["probleme"]
+    assert [s.term for s in spell.lookup("problme", "fr", 2, options=LookupOptions(verbose=2))] == ["probleme"]
+    assert searched == []
+    spell.lookup("soluton", "fr", 2)
+    assert searched == ["soluton"]
+    assert [(s.term, s.distance) for s in spell.lookup("soluton", "fr", 2)] == [("solution", 1)]
+    suggestions = spell.lookup("solutin", "fr", 2, options=LookupOptions(verbose=2))
+    assert [(s.term, s.distance) for s in suggestions] == [("solution", 1), ("solutions", 2)]
+    assert spell.lookup_compound("cette solutin", "fr", 2).term == "cette solution"
+
+
+def test_hybrid_keeps_rare_words(tmpdir):
+    corpus = tmpdir.join("dict.txt")
+    corpus.write("le 100\navec 20\ncette 15\nsolution 10\nsolutions 1\n")
+    spell = SySpellCompound()
+    assert spell.load_dictionary(str(corpus), "fr", 0, 1, top_words=4)
+
+    # A tail word is spelled right even though the index has a word at distance 1
+    assert [(s.term, s.count, s.distance) for s in spell.lookup("solutions", "fr", 2)] == [("solutions", 1, 0)]
+    suggestions = spell.lookup("solutions", "fr", 2, options=LookupOptions(verbose=2))
+    assert [(s.term, s.distance) for s in suggestions] == [("solutions", 0), ("solution", 1)]
+    assert spell.lookup_compound("avec solutions", "fr", 2).term == "avec solutions"
+    assert spell.lookup_compound("avec soluton", "fr", 2).term == "avec solution"
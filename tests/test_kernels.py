@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.kernels`."""
+
+import random
+
+from symspellcompound import symspellcompound
+from symspellcompound.kernels import damerau_levenshtein_banded, damerau_levenshtein_batch
+from symspellcompound.options import LookupOptions
+from symspellcompound.symspellcompound import distance_between_words
+
+
+def test_damerau_levenshtein_batch():
+    rng = random.Random(0)
+    for _ in range(200):
+        term = "".join(rng.choice("abcé") for _ in range(rng.randint(0, 8)))
+        words = ["".join(rng.choice("abcé") for _ in range(rng.randint(0, 9))) for _ in range(rng.randint(1, 20))]
+        assert damerau_levenshtein_batch(term, words).tolist() == [distance_between_words(term, w) for w in words]
+    assert damerau_levenshtein_batch("ca", ["abc", "ac"]).tolist() == [3, 1]
+
+
+def test_batched_lookup(monkeypatch, make_index, words):
+    spell = make_index(words + [("la", 90), ("les", 50), ("ce", 30), ("se", 20), ("me", 10)])
+    options = LookupOptions(verbose=2)
+    expected = [(s.term, s.distance) for s in spell.lookup("lse", "fr", options=options)]
+    monkeypatch.setattr(symspellcompound, "BATCH_MIN", 1)
+    assert [(s.term, s.distance) for s in spell.lookup("lse", "fr", options=options)] == expected
+
+
+def test_damerau_levenshtein_banded():
+    rng = random.Random(0)
+    for _ in range(500):
+        term = "".join(rng.choice("abcé ") for _ in range(rng.randint(0, 12)))
+        other = list(term)
+        for _ in range(rng.randint(0, 4)):
+            position = rng.randint(0, max(len(other) - 2, 0))
+            other[position:position + 2] = rng.choice([other[position:position + 2][::-1], [], ["a"], ["é", "b"]])
+        other = "".join(other)
+        bound = rng.randint(0, 6)
+        distance = distance_between_words(term, other)
+        banded = damerau_levenshtein_banded(term, other, bound)
+        assert banded == distance if distance <= bound else banded > bound
+    assert damerau_levenshtein_banded("ca", "abc", 3) == 3
+
+
+def test_banded_compound_distance(monkeypatch, make_index):
+    spell = make_index()
+    sentence = "le problme avc cete solutin " * 4
+    expected = spell.lookup_compound(sentence, "fr", 2)
+    monkeypatch.setattr(symspellcompound, "BANDED_MIN", 1)
+    suggestion = spell.lookup_compound(sentence, "fr", 2)
+    assert (suggestion.term, suggestion.distance) == (expected.term, expected.distance) == \
+        (expected.term, distance_between_words(expected.term, sentence))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.loadtest`."""
+
+from symspellcompound.loadtest import LoadTest, percentile, synthetic_queries, parse_objectives
+
+
+def test_percentile():
+    values = list(range(1, 1001))
+    assert [percentile(values, q) for q in (50, 95, 99, 99.9, 100)] == [500, 950, 990, 999, 1000]
+    assert percentile([], 50) is None
+    assert parse_objectives(["p99=20", "p99.9=50"]) == {"p99": 0.02, "p99.9": 0.05}
+
+
+def test_synthetic_queries(tmpdir):
+    corpus = tmpdir.join("model.txt")
+    corpus.write("Le probleme avec cette solution, le probleme.\n")
+    queries = synthetic_queries(corpus=str(corpus), count=50, words_per_query=2, max_edits=1)
+    assert len(queries) == 50 and all(len(query.split()) <= 2 for query in queries)
+    assert queries == synthetic_queries(corpus=str(corpus), count=50, words_per_query=2, max_edits=1)
+
+
+def test_load_test(index):
+    report = LoadTest(index, "fr", ["problme", "avc", "le solutin"], qps=200, workers=2, compound=True,
+                      duration=0.1).run()
+    assert report.queries == 20 and report.errors == 0
+    assert report.latencies["p50"] <= report.latencies["p99.9"] == report.max_latency
+    assert report.max_rss > 0
+    assert report.violations({"p50": 10}) == {} and "p50" in report.violations({"p50": 0})
+
+
+def test_load_test_keeps_first_errors(index, monkeypatch):
+    lookup = index.lookup
+
+    def failing_lookup(query, language, options=None):
+        if query == "boom":
+            raise KeyError(query)
+        if query.startswith("bang"):
+            raise ValueError(query)
+        return lookup(query, language, options=options)
+    monkeypatch.setattr(index, "lookup", failing_lookup)
+    # Each worker fails on its own "bang", the earliest one scheduled is kept
+    report = LoadTest(index, "fr", ["problme", "boom", "bang 1", "bang 2"], qps=400, workers=2, duration=0.05).run()
+    assert report.queries == 20 and report.errors == 15
+    assert report.first_errors == {"KeyError": (5, "KeyError('boom')"), "ValueError": (10, "ValueError('bang 1')")}
+    assert "10 x ValueError, first: ValueError('bang 1')" in str(report)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `SySpellCompound.freeze` and `LookupOptions`."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from symspellcompound.errors import FrozenIndexException
+from symspellcompound.options import LookupOptions
+
+
+def test_frozen_index_is_read_only(index):
+    frozen = index.freeze()
+    with pytest.raises(FrozenIndexException):
+        frozen.verbose = 2
+    with pytest.raises(FrozenIndexException):
+        frozen.create_dictionary_entry(key="solution", language="fr", count=1)
+    with pytest.raises(TypeError):
+        frozen.dictionary["frsolution"] = 0
+
+
+def test_freezing_is_one_way(make_index, words):
+    spell = make_index(words=[(word, count) for word, count in words if word != "solution"])
+    frozen = spell.freeze()
+    with pytest.raises(FrozenIndexException):
+        spell.create_dictionary_entry(key="solution", language="fr", count=8)
+    with pytest.raises(FrozenIndexException):
+        spell.compress_vocabulary()
+    # Nothing was added behind the frozen index's back
+    assert frozen.lookup("solutin", "fr", 2) == []
+    assert frozen.lookup_compound("cette solutin", "fr", 2).term == "cette solutin"
+
+
+def test_options_per_call_from_threads(index):
+    frozen = index.freeze()
+    top = LookupOptions(verbose=0)
+    everything = LookupOptions(verbose=2, edit_distance_max=2)
+    no_compound = LookupOptions(enable_compound_check=False)
+
+    def query(i):
+        if i % 3 == 0:
+            return [s.term for s in frozen.lookup("problemes", "fr", options=top)]
+        if i % 3 == 1:
+            return [s.term for s in frozen.lookup("problemes", "fr", options=everything)]
+        return frozen.lookup_compound("leprobleme avec", "fr", options=no_compound).term
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(query, range(60)))
+    assert results[0::3] == [["problemes"]] * 20
+    assert results[1::3] == [["problemes", "probleme"]] * 20
+    assert results[2::3] == ["probleme avec"] * 20
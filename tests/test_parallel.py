@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.parallel`."""
+
+import pytest
+
+from symspellcompound.classifier import TokenClassifier
+from symspellcompound.parallel import DocumentCorrector, split_windows
+from symspellcompound.symspellcompound import SySpellCompound
+
+DOCUMENT = "le problme avc cete solutin est simple. la maisonbleue est la maison. " \
+           "le prob leme avec cette soltion. lamaison bleu est simple ! " * 6
+
+
+@pytest.mark.parametrize("overlap", [1, 3])
+def test_document_matches_sequential(overlap, make_index, words):
+    spell = make_index(words + [("est", 50), ("simple", 6), ("la", 90), ("maison", 12), ("bleue", 3)])
+    spell.token_classifier = TokenClassifier()
+    expected = spell.lookup_compound(DOCUMENT, "fr", 2)
+
+    with DocumentCorrector(spell, processes=2, chunk_size=7, overlap=overlap) as corrector:
+        suggestion = corrector.lookup_compound(DOCUMENT, "fr", 2)
+    assert str(suggestion) == str(expected)
+    with pytest.raises(ValueError):
+        DocumentCorrector(spell, overlap=0)
+
+
+def test_split_windows_prefers_sentence_ends():
+    spell = SySpellCompound()
+    tokens = spell.classify_tokens("a b c. d e f g h", "fr")
+    assert split_windows(tokens, 4) == [(0, 3), (3, 7), (7, 8)]
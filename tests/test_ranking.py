@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.ranking`."""
+
+from symspellcompound.options import LookupOptions
+from symspellcompound.ranking import NoisyChannelRanker, align
+
+
+def test_align():
+    assert align("problme", "probleme") == [("del", "e", None)]
+    assert align("porbleme", "probleme") == [("trans", "ro", "or")]
+    assert align("cwtte", "cette") == [("sub", "e", "w")]
+
+
+def test_keyboard_neighbours_are_cheaper():
+    ranker = NoisyChannelRanker.from_keyboard("AZERTY")
+    near, far = ranker.costs("cwtte", ["cette", "cotte"])
+    assert near < far
+    assert ranker.costs("cette", ["cette"])[0] == 0
+
+
+def test_characters_outside_of_the_table_only_match_themselves():
+    ranker = NoisyChannelRanker.from_keyboard("AZERTY")  # no â nor ê
+    same, other, plain = ranker.costs("pâte", ["pâte", "pête", "pate"])
+    assert same == 0 and other > 0 and plain > 0
+
+
+def test_learned_pairs_change_ranking(make_index):
+    spell = make_index([("cette", 10), ("cote", 40)])
+    assert spell.lookup("cete", "fr", 2)[0].term == "cote"
+
+    spell.ranker = NoisyChannelRanker.from_keyboard("AZERTY").learn([("cete", "cette")] * 50)
+    assert spell.lookup("cete", "fr", 2)[0].term == "cette"
+    assert [s.term for s in spell.lookup("cete", "fr", 2, options=LookupOptions(verbose=2))] == ["cette", "cote"]
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.service`."""
+
+import threading
+import time
+import weakref
+
+from symspellcompound.options import LookupOptions
+from symspellcompound.items import DictionaryItem
+from symspellcompound.service import SpellService, load_index
+from symspellcompound.symspellcompound import SySpellCompound
+
+
+def large_index(entries):
+    spell = SySpellCompound()
+    for i in range(entries):
+        item = DictionaryItem()
+        item.suggestions = [i]
+        spell.item_list.append(item)
+        spell.dictionary["fr{:07d}".format(i)] = -i - 1
+    return spell
+
+
+def longest_stall(action):
+    """Longest pause seen by a thread ticking every 0.5 ms while `action` runs."""
+    stop = []
+    longest = [0.0]
+
+    def tick():
+        last = time.perf_counter()
+        while not stop:
+            time.sleep(0.0005)
+            now = time.perf_counter()
+            longest[0] = max(longest[0], now - last)
+            last = now
+    ticker = threading.Thread(target=tick)
+    ticker.start()
+    time.sleep(0.02)
+    action()
+    stop.append(True)
+    ticker.join()
+    return longest[0]
+
+
+def test_swap_keeps_in_flight_index(make_index):
+    service = SpellService(make_index([("probleme", 10)]))
+    handle = service.acquire()
+    old_spell = handle.spell
+    generation = service.build_in_background(make_index, [("solution", 5)]).result()
+
+    assert generation == 2
+    assert service.lookup("solutin", "fr", 2)[0].term == "solution"
+    assert handle.spell is old_spell
+    assert handle.spell.lookup("problme", "fr", 2)[0].term == "probleme"
+    handle.release()
+    assert handle.spell is None
+    service.shutdown()
+
+
+def test_retired_index_freed_in_background(make_index):
+    service = SpellService(make_index([("probleme", 10)]))
+    handle = service.acquire()
+    freed_by = []
+    weakref.finalize(handle.spell, lambda: freed_by.append(threading.get_ident()))
+    service.swap(make_index([("solution", 5)]))
+    handle.release()  # last in-flight request
+    service.shutdown(wait=True)
+    assert freed_by and freed_by[0] != threading.get_ident()
+
+
+def test_retired_index_does_not_stall_requests(make_index):
+    dropped = [large_index(300000)]
+    full_free = longest_stall(lambda: dropped.pop())
+
+    service = SpellService(large_index(300000))
+    handle = service.acquire()
+    freed = threading.Event()
+    weakref.finalize(handle.spell, freed.set)
+    build = service._executor.submit(time.sleep, 1)  # the retirement does not wait for a build in progress
+    service.swap(make_index([("solution", 5)]))
+
+    def retire():
+        handle.release()
+        assert freed.wait(timeout=10)
+    teardown_stall = longest_stall(retire)
+    assert not build.done()
+    assert teardown_stall < full_free / 3
+    service.shutdown()
+
+
+def test_load_in_background(tmpdir):
+    corpus = tmpdir.join("dict.txt")
+    corpus.write("avec 20\ncette 15\n")
+    service = SpellService()
+    assert service.load_in_background(str(corpus), "fr").result() == 1
+    assert service.lookup_compound("avec cette", "fr", 2).term == "avec cette"
+    suggestions = service.lookup("avc", "fr", options=LookupOptions(verbose=2, edit_distance_max=1))
+    assert [s.term for s in suggestions] == ["avec"]
+    assert isinstance(load_index(str(corpus), "fr"), SySpellCompound)
+    service.shutdown()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.sharding`."""
+
+import pytest
+
+from symspellcompound.errors import UnsupportedOperationException
+from symspellcompound.sharding import ShardedSpellCompound, serve_shard, shard_for
+from symspellcompound.symspellcompound import SySpellCompound
+
+QUERIES = ["problme", "problemse", "avc", "cete", "solutin", "lle", "xyz", "le"]
+
+
+def test_shard_for_is_stable():
+    assert shard_for("frprobleme", 4) == shard_for("frprobleme", 4)
+    assert 0 <= shard_for("frprobleme", 4) < 4
+
+
+def test_sharded_lookup_matches_local(words):
+    words += [("cet", 12), ("la", 90), ("les", 80)]
+    local = SySpellCompound()
+    with ShardedSpellCompound.spawn_local(shards=3) as sharded:
+        for word, count in words:
+            local.create_dictionary_entry(key=word, language="fr", count=count)
+            sharded.create_dictionary_entry(key=word, language="fr", count=count)
+
+        assert sum(sharded.shard_sizes()) > 0
+        for verbose in (0, 1, 2):
+            local.verbose = sharded.verbose = verbose
+            for query in QUERIES:
+                expected = [str(s) for s in local.lookup(query, "fr", 2)]
+                assert [str(s) for s in sharded.lookup(query, "fr", 2)] == expected
+        with pytest.raises(UnsupportedOperationException):
+            sharded.freeze()
+        with pytest.raises(UnsupportedOperationException):
+            sharded.load_dictionary("dict.txt", "fr", 0, 1, top_words=10)
+
+
+def test_shards_require_an_authkey():
+    with pytest.raises(ValueError):
+        serve_shard(address=("0.0.0.0", 0))
+    with pytest.raises(ValueError):
+        ShardedSpellCompound(addresses=[("127.0.0.1", 1)])
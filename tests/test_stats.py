@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `SySpellCompound.stats` and `symspellcompound.stats`."""
+
+from symspellcompound.stats import estimate_index
+
+
+def test_stats(index, words):
+    stats = index.stats()
+
+    assert stats["words"] == len(words)
+    assert stats["entries"] == len(index.dictionary) == stats["int_entries"] + stats["item_entries"]
+    assert sum(stats["suggestion_lengths"].values()) == stats["entries"]
+    assert stats["deletes_per_word_length"][2] == 2
+    assert stats["bytes"]["total"] == sum(v for k, v in stats["bytes"].items() if k != "total")
+    assert stats["bytes"]["dictionary"] > stats["bytes"]["word_list"] > 0
+
+
+def test_estimate_index():
+    vocabulary = ["".join(chr(97 + (i * 7 + j * 3) % 26) for j in range(4 + i % 6)) for i in range(400)]
+    estimate = estimate_index(vocabulary, edit_distance_max=1, max_length=8, sample_size=100)
+
+    assert estimate["words"] == sum(len(word) <= 8 for word in vocabulary)
+    assert estimate["entries"] > estimate["sample"]["entries"]
+    assert estimate["bytes"] > estimate["sample"]["bytes"]["total"]
+    assert estimate["build_seconds"] > 0
@@ -5,7 +5,8 @@
 
 import pytest
 
-from ..symspellcompound.symspellcompound import SySpellCompound
+from symspellcompound.options import LookupOptions
+from symspellcompound.symspellcompound import SySpellCompound
 
 ssc = SySpellCompound()
 @pytest.fixture
@@ -22,3 +23,42 @@ def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
     # from bs4 import BeautifulSoup
     assert ssc
+
+
+def test_lazy_typo_distance():
+    import subprocess
+    import sys
+    code = ("import sys; from symspellcompound.symspellcompound import DISTANCE_MAPPER; "
+            "assert 'numpy' not in sys.modules and 'symspellcompound.data' not in sys.modules; "
+            "assert DISTANCE_MAPPER['typo']('cete', 'cette', 'AZERTY') > 0; "
+            "assert 'symspellcompound.typo_distance' in sys.modules")
+    subprocess.check_call([sys.executable, "-c", code])
+
+
+def test_generate_deletes():
+    from symspellcompound.deletes import generate_deletes
+    assert generate_deletes("abc", 1) == {"bc", "ac", "ab"}
+    assert generate_deletes("aab", 2) == {"ab", "aa", "a", "b"}
+    from itertools import combinations
+    word = "problemes"
+    expected = {"".join(c for i, c in enumerate(word) if i not in removed)
+                for k in (1, 2, 3) for removed in combinations(range(len(word)), k)}
+    assert generate_deletes(word, 3) == expected
+
+
+def test_lookup_two_substitutions():
+    spell = SySpellCompound()
+    spell.create_dictionary_entry(key="probleme", language="fr", count=10)
+    assert [str(s) for s in spell.lookup("prxblxme", "fr", 2)] == ["probleme:10:2"]
+
+
+def test_accent_folded_index():
+    spell = SySpellCompound(normalizer="accents")
+    for word, count in [("problème", 10), ("pêche", 5), ("péché", 3), ("cœur", 4), ("avec", 20)]:
+        spell.create_dictionary_entry(key=word, language="fr", count=count)
+
+    assert [str(s) for s in spell.lookup("probleme", "fr", 2)] == ["problème:10:0"]
+    assert [str(s) for s in spell.lookup("probleme", "fr", 2, options=LookupOptions(verbose=1))] == ["problème:10:0"]
+    assert [s.term for s in spell.lookup("peche", "fr", 2, options=LookupOptions(verbose=1))] == ["pêche", "péché"]
+    assert [str(s) for s in spell.lookup("coeur", "fr", 2)] == ["cœur:4:0"]
+    assert spell.lookup_compound("le probleme avc", "fr", 2).term.endswith("problème avec")
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.trie`."""
+
+import pytest
+
+from symspellcompound.errors import EngineException
+from symspellcompound.options import LookupOptions
+from symspellcompound.symspellcompound import SySpellCompound, distance_between_words
+
+
+@pytest.fixture
+def trie_words(words):
+    return words + [("solutions", 2), ("absolution", 1), ("ca", 4)]
+
+
+@pytest.fixture
+def trie_index(make_index, trie_words):
+    return make_index(trie_words, engine="trie")
+
+
+def test_trie_matches_brute_force(trie_index, trie_words):
+    spell = trie_index
+    assert len(spell.dictionary) == len(trie_words)  # no deletes
+    for term in ("problme", "soluton", "sloution", "abc", "cette", "avecc", "probelmes", "x"):
+        for edit_distance_max in (1, 2, 3):
+            expected = sorted((-count, word) for word, count in trie_words
+                              if distance_between_words(word, term) <= edit_distance_max)
+            suggestions = spell.lookup(term, "fr", options=LookupOptions(verbose=2,
+                                                                         edit_distance_max=edit_distance_max))
+            assert sorted((-s.count, s.term) for s in suggestions) == expected
+            assert all(s.distance == distance_between_words(s.term, term) for s in suggestions)
+
+
+def test_trie_lookup(trie_index):
+    spell = trie_index
+    assert [(s.term, s.distance) for s in spell.lookup("probleme", "fr", 3)] == [("probleme", 0)]
+    assert [s.term for s in spell.lookup("soluton", "fr", options=LookupOptions(verbose=1))] == ["solution"]
+    assert spell.lookup_compound("le problm avc cete solutin", "fr", 3).term == "le probleme avec cette solution"
+    with pytest.raises(EngineException):
+        SySpellCompound(engine="automaton")
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for `symspellcompound.vocabulary`."""
+
+import pytest
+
+from symspellcompound.options import LookupOptions
+from symspellcompound.vocabulary import FrontCodedVocabulary
+
+ACCENTED = [("problème", 2), ("œuvre", 1)]
+
+
+def test_front_coded_vocabulary(words):
+    terms = sorted((word for word, _ in words + ACCENTED), key=lambda term: term.encode("utf-8"))
+    vocabulary = FrontCodedVocabulary(terms, block_size=4)
+    assert len(vocabulary) == len(terms) and list(vocabulary) == terms
+    assert [vocabulary[i] for i in range(len(terms))] == terms and vocabulary[-1] == terms[-1]
+    assert [vocabulary.index(term) for term in terms] == list(range(len(terms)))
+    assert "problem" not in vocabulary and "problemes" in vocabulary
+    vocabulary.append("zebre")
+    assert vocabulary[len(terms)] == "zebre" and vocabulary.index("zebre") == len(terms)
+    assert list(FrontCodedVocabulary(["b", "a"], block_size=1)) == ["b", "a"]
+    with pytest.raises(ValueError):
+        FrontCodedVocabulary(["b", "a"]).index("a")
+    with pytest.raises(ValueError):
+        FrontCodedVocabulary(["a\x00b"])
+
+
+@pytest.mark.parametrize("index", [{}, {"normalizer": "accents"}, {"engine": "trie"}], indirect=True)
+def test_compress_vocabulary(index):
+    spell = index
+    for word, count in ACCENTED:
+        spell.create_dictionary_entry(word, "fr", count)
+    options = LookupOptions(verbose=2)
+    queries = ["problme", "soluton", "avc", "cete", "oeuvre", "le"]
+    expected = [[(s.term, s.count, s.distance) for s in spell.lookup(q, "fr", options=options)] for q in queries]
+    sentence = str(spell.lookup_compound("le problme avc cete solutin", "fr"))
+
+    vocabulary = spell.compress_vocabulary(block_size=4)
+    assert isinstance(spell.word_list, FrontCodedVocabulary) and list(vocabulary) == sorted(vocabulary)
+    assert [[(s.term, s.count, s.distance) for s in spell.lookup(q, "fr", options=options)]
+            for q in queries] == expected
+    assert all(vocabulary[vocabulary.index(word)] == word for word in vocabulary)
+
+    spell.create_dictionary_entry("zebre", "fr", 1)
+    assert spell.lookup("zebr", "fr")[0].term == "zebre"
+    assert str(spell.freeze().lookup_compound("le problme avc cete solutin", "fr")) == sentence